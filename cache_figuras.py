@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo para regeneração incremental das figuras.
+
+Cada figura registra um hash dos seus dados de entrada e parâmetros de plotagem
+em um manifesto ('.hashes_figuras.json') na pasta da figura. A figura só é
+refeita quando esse hash muda, quando o arquivo não existe ou quando forçada.
+As opções --forcar-figuras e --sem-figuras são lidas pelo script principal e
+passadas às funções como 'forcar' e 'sem_figuras'.
+
+@author: Gustavo Starling
+
+"""
+
+import os
+import inspect
+from utilitarios import calcular_hash, carregar_manifesto, atualizar_manifesto
+
+NOME_MANIFESTO = '.hashes_figuras.json'
+
+def _caminho_manifesto(filename):
+    return os.path.join(os.path.dirname(filename) or '.', NOME_MANIFESTO)
+
+# Verifica se a figura precisa ser gerada novamente
+def precisa_regenerar(filename, hash_figura, forcar=False, sem_figuras=False):
+    """
+    Indica se a figura deve ser refeita.
+
+    Args:
+        filename (str): Caminho da figura.
+        hash_figura (str): Hash atual das entradas (ver calcular_hash).
+        forcar (bool, opcional): Regenera mesmo que o hash não tenha mudado (--forcar-figuras).
+        sem_figuras (bool, opcional): Nenhuma figura é gerada (--sem-figuras).
+
+    Returns:
+        bool: True se a figura não existe, se o hash mudou ou se foi forçada
+        (sempre False com sem_figuras).
+    """
+    if sem_figuras:
+        return False
+    if forcar or not os.path.exists(filename):
+        return True
+    manifesto = carregar_manifesto(_caminho_manifesto(filename))
+    return manifesto.get(os.path.basename(filename)) != hash_figura
+
+# Registra o hash de uma figura recém-gerada no manifesto
+def registrar_figura(filename, hash_figura):
+    atualizar_manifesto(_caminho_manifesto(filename), os.path.basename(filename), hash_figura)
+
+# Chama uma função de plotagem apenas se as entradas da figura mudaram
+def gerar_figura(funcao_plot, *args, forcar=False, sem_figuras=False, **kwargs):
+    """
+    Executa funcao_plot(*args, **kwargs) somente quando o hash das entradas, dos
+    parâmetros de plotagem ou do código da função mudou.
+
+    A função de plotagem deve receber o caminho de saída no parâmetro 'filename'.
+    'forcar' e 'sem_figuras' têm o mesmo sentido que em precisa_regenerar.
+
+    Returns:
+        bool: True se a figura foi gerada, False se a versão em disco foi reaproveitada.
+    """
+    # Com sem_figuras nem o hash é calculado
+    if sem_figuras:
+        return False
+
+    argumentos = inspect.signature(funcao_plot).bind(*args, **kwargs)
+    argumentos.apply_defaults()
+    filename = argumentos.arguments['filename']
+
+    # O código da função entra no hash: mudar títulos, cores ou tamanhos fixos nela também refaz a figura
+    try:
+        codigo = inspect.getsource(funcao_plot)
+    except (OSError, TypeError):
+        codigo = funcao_plot.__name__
+    hash_figura = calcular_hash(codigo, **argumentos.arguments)
+
+    if not precisa_regenerar(filename, hash_figura, forcar):
+        print(f"Figura inalterada, mantida: {filename}")
+        return False
+
+    os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+    funcao_plot(*args, **kwargs)
+    registrar_figura(filename, hash_figura)
+    return True
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo para checkpoints de execuções longas (retomada com --resume).
+
+Cada fatia de tempo ou etapa concluída é salva em 'outputs/checkpoints' e
+registrada em um manifesto ('manifesto.json') junto com o hash das suas
+entradas. O resultado é gravado antes do manifesto, e ambos por escrita
+atômica (ver utilitarios.escrita_atomica), de modo que uma execução
+interrompida nunca deixa um checkpoint parcial marcado como válido. Quem
+chama decide se retoma (retomar=True, em main11.py com --resume): nesse caso
+o que já tem checkpoint válido é carregado em vez de recalculado.
+
+@author: Gustavo Starling
+
+"""
+
+import os
+import pickle
+from datetime import datetime
+from utilitarios import calcular_hash, escrita_atomica, carregar_manifesto, atualizar_manifesto
+
+DIR_CHECKPOINTS = os.path.join('outputs', 'checkpoints')
+NOME_MANIFESTO = 'manifesto.json'
+
+def _caminho_manifesto(output_dir):
+    return os.path.join(output_dir, NOME_MANIFESTO)
+
+# Identifica os datasets pelos arquivos de origem, sem ler os valores
+def identificar_fontes(*datasets):
+    """
+    Gera uma identificação barata das entradas para as chaves dos checkpoints.
+
+    Args:
+        *datasets (xr.Dataset): Datasets abertos de arquivo (ex.: saída de load_era5_data).
+
+    Returns:
+        list: Para cada dataset, (caminho, tamanho, mtime_ns) do arquivo de origem. Um
+        dataset sem arquivo de origem (criado em memória) entra pelo hash do conteúdo.
+    """
+    fontes = []
+    for dados in datasets:
+        origem = dados.encoding.get('source')
+        if origem and os.path.exists(origem):
+            info = os.stat(origem)
+            fontes.append((os.path.abspath(origem), info.st_size, info.st_mtime_ns))
+        else:
+            fontes.append(calcular_hash(dados))
+    return fontes
+
+# Verifica se existe um checkpoint concluído para as mesmas entradas
+def checkpoint_valido(nome, hash_entrada, output_dir=DIR_CHECKPOINTS):
+    """
+    Indica se o checkpoint 'nome' pode ser reaproveitado.
+
+    Args:
+        nome (str): Nome da fatia ou etapa (ex.: 'agregacao_1990').
+        hash_entrada (str): Hash atual das entradas (ver utilitarios.calcular_hash).
+        output_dir (str, opcional): Diretório dos checkpoints. Padrão é 'outputs/checkpoints'.
+
+    Returns:
+        bool: True se o manifesto registra o mesmo hash e todos os arquivos ainda existem.
+    """
+    registro = carregar_manifesto(_caminho_manifesto(output_dir)).get(nome)
+    if registro is None or registro.get('hash') != hash_entrada:
+        return False
+    arquivos = [os.path.join(output_dir, registro['arquivo'])] + registro.get('arquivos', [])
+    return all(os.path.exists(arquivo) for arquivo in arquivos)
+
+# Lê o resultado salvo de um checkpoint
+def carregar_checkpoint(nome, output_dir=DIR_CHECKPOINTS):
+    registro = carregar_manifesto(_caminho_manifesto(output_dir))[nome]
+    with open(os.path.join(output_dir, registro['arquivo']), 'rb') as f:
+        return pickle.load(f)
+
+# Salva o resultado de uma fatia ou etapa e o registra no manifesto
+def salvar_checkpoint(nome, hash_entrada, resultado, arquivos=(), output_dir=DIR_CHECKPOINTS):
+    """
+    Grava o resultado e depois o registra no manifesto, ambos de forma atômica.
+
+    Args:
+        nome (str): Nome da fatia ou etapa.
+        hash_entrada (str): Hash das entradas usadas para produzir o resultado.
+        resultado: Objeto serializável com pickle (ex.: xr.Dataset carregado, dict de caminhos).
+        arquivos (iterable, opcional): Arquivos gerados pela etapa que também precisam existir.
+        output_dir (str, opcional): Diretório dos checkpoints. Padrão é 'outputs/checkpoints'.
+    """
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    nome_arquivo = f'{nome}.pkl'
+    with escrita_atomica(os.path.join(output_dir, nome_arquivo), 'wb') as f:
+        pickle.dump(resultado, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    atualizar_manifesto(_caminho_manifesto(output_dir), nome, {
+        'hash': hash_entrada,
+        'arquivo': nome_arquivo,
+        'arquivos': [str(arquivo) for arquivo in arquivos],
+        'concluido_em': datetime.now().isoformat(timespec='seconds'),
+    })
+
+# Executa uma etapa, ou a carrega do checkpoint quando retomando com as mesmas entradas
+def executar_com_checkpoint(nome, hash_entrada, funcao, *args, retomar=False, output_dir=DIR_CHECKPOINTS, **kwargs):
+    """
+    Retorna funcao(*args, **kwargs), reaproveitando o checkpoint válido quando retomar=True.
+
+    Returns:
+        O resultado da etapa (recalculado ou lido do checkpoint).
+    """
+    if retomar and checkpoint_valido(nome, hash_entrada, output_dir):
+        print(f"Checkpoint válido, etapa retomada: {nome}")
+        return carregar_checkpoint(nome, output_dir)
+
+    resultado = funcao(*args, **kwargs)
+    salvar_checkpoint(nome, hash_entrada, resultado, output_dir=output_dir)
+    return resultado
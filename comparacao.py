@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo para comparação entre conjuntos de dados em grade (ERA5, ERA5-Land, WorldClim...).
+
+Todos os datasets passam pelo mesmo recorte (spatial_subset) e pelas mesmas
+estatísticas anuais, em paralelo. A máscara da Região Sul e os pesos de área
+de cada grade são calculados uma única vez e reaproveitados por todos os
+datasets que usam a mesma grade. Opcionalmente os campos são regridados de
+forma conservativa para uma grade comum, para gerar os mapas de diferença.
+
+Os datasets devem seguir o esquema 't2m'/'tp'/'valid_time' (ver process_era5.open_era5_file).
+
+@author: Gustavo Starling
+
+"""
+
+import os
+import threading
+import numpy as np
+import pandas as pd
+import xarray as xr
+import shapely
+from concurrent.futures import ThreadPoolExecutor
+from process_era5 import load_era5_data, combine_era5_datasets, load_south_america_shapefile, spatial_subset
+from utilitarios import calcular_hash
+from cache_figuras import gerar_figura
+
+# Máscaras e pesos já calculados, por grade (latitudes, longitudes e geometria)
+_cache_grades = {}
+_trava_cache = threading.Lock()
+
+# Calcula (uma vez por grade) a máscara da região e os pesos de área das células
+def mascara_e_pesos(latitudes, longitudes, geometria):
+    """
+    Retorna a máscara (centro da célula dentro da geometria) e os pesos cos(lat) da grade.
+
+    Returns:
+        tuple: (mascara, pesos) como xr.DataArray ('latitude', 'longitude'); os pesos são zero fora da região.
+    """
+    chave = calcular_hash(np.asarray(latitudes), np.asarray(longitudes), geometria.wkb)
+    with _trava_cache:
+        if chave not in _cache_grades:
+            lon2d, lat2d = np.meshgrid(np.asarray(longitudes), np.asarray(latitudes))
+            coords = {'latitude': latitudes, 'longitude': longitudes}
+            mascara = xr.DataArray(shapely.contains_xy(geometria, lon2d, lat2d),
+                                   dims=('latitude', 'longitude'), coords=coords)
+            pesos = np.cos(np.deg2rad(lat2d)) * mascara
+            _cache_grades[chave] = (mascara, pesos)
+        return _cache_grades[chave]
+
+# Calcula as bordas das células a partir dos centros de uma coordenada regular
+def _bordas(centros):
+    centros = np.asarray(centros, dtype=float)
+    meios = (centros[1:] + centros[:-1]) / 2
+    return np.concatenate([[2 * centros[0] - meios[0]], meios, [2 * centros[-1] - meios[-1]]])
+
+# Matriz de sobreposição entre as células de origem e de destino em um eixo
+def _matriz_sobreposicao(bordas_origem, bordas_destino):
+    origem = np.sort(np.stack([bordas_origem[:-1], bordas_origem[1:]], axis=1), axis=1)
+    destino = np.sort(np.stack([bordas_destino[:-1], bordas_destino[1:]], axis=1), axis=1)
+    inferior = np.maximum(destino[:, None, 0], origem[None, :, 0])
+    superior = np.minimum(destino[:, None, 1], origem[None, :, 1])
+    return np.clip(superior - inferior, 0, None)
+
+# Regrida de forma conservativa (por área) um dataset para outra grade regular
+def regridar_conservativo(dados, latitudes_destino, longitudes_destino):
+    """
+    Regridagem conservativa de primeira ordem entre grades regulares de latitude/longitude.
+
+    A sobreposição em latitude é medida em seno da latitude (área na esfera) e em
+    longitude em graus. Células de origem com NaN são ignoradas no peso.
+
+    Returns:
+        xr.Dataset ou xr.DataArray: Dados na grade de destino.
+    """
+    sobrepos_lat = _matriz_sobreposicao(np.sin(np.deg2rad(_bordas(dados['latitude']))),
+                                        np.sin(np.deg2rad(_bordas(latitudes_destino))))
+    sobrepos_lon = _matriz_sobreposicao(_bordas(dados['longitude']), _bordas(longitudes_destino))
+
+    def regridar(valores):
+        validos = ~np.isnan(valores)
+        soma = np.einsum('ij,...jk,lk->...il', sobrepos_lat, np.where(validos, valores, 0.0), sobrepos_lon)
+        area = np.einsum('ij,...jk,lk->...il', sobrepos_lat, validos.astype(float), sobrepos_lon)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(area > 0, soma / area, np.nan)
+
+    return xr.apply_ufunc(
+        regridar, dados,
+        input_core_dims=[['latitude', 'longitude']],
+        output_core_dims=[['lat_destino', 'lon_destino']],
+        exclude_dims={'latitude', 'longitude'},
+    ).rename(lat_destino='latitude', lon_destino='longitude').assign_coords(
+        latitude=np.asarray(latitudes_destino), longitude=np.asarray(longitudes_destino))
+
+# Executa o recorte e as estatísticas anuais de um dataset, usando a máscara da sua grade
+def _estatisticas_dataset(dados, geometria):
+    recortado = spatial_subset(dados, geometria)
+    mascara, pesos = mascara_e_pesos(recortado['latitude'].values, recortado['longitude'].values, geometria)
+    recortado = recortado.where(mascara)
+
+    por_ano = recortado.groupby(recortado['valid_time'].dt.year)
+    anuais = por_ano.mean(dim='valid_time')
+    maximas = por_ano.max(dim='valid_time')
+
+    regionais = anuais.weighted(pesos).mean(dim=['latitude', 'longitude'])
+    tabela = pd.DataFrame({
+        'Temperatura Média Anual (°C)': regionais['t2m'].values - 273.15,
+        'Temperatura Máxima Anual (°C)': maximas['t2m'].max(dim=['latitude', 'longitude']).values - 273.15,
+        'Precipitação Média Anual (m)': regionais['tp'].values,
+    }, index=pd.Index(anuais['year'].values, name='Ano'))
+
+    # Campo climatológico (média de todos os anos) usado nos mapas de diferença
+    return tabela, anuais.mean(dim='year')
+
+# Compara vários datasets em grade, compartilhando máscaras e pesos entre eles
+def comparar_datasets(datasets, geometria, referencia=None, regridar=True,
+                      output_dir='outputs/comparacao', figures_dir='figures', n_threads=None,
+                      forcar_figuras=False, sem_figuras=False):
+    """
+    Roda recorte e estatísticas de vários datasets em paralelo e gera tabelas e mapas de diferença.
+
+    Args:
+        datasets (dict): Nome -> xr.Dataset com 't2m', 'tp' e 'valid_time'.
+        geometria (Polygon): Geometria da Região Sul (ver load_south_america_shapefile).
+        referencia (str, opcional): Dataset de referência. Padrão é o primeiro.
+        regridar (bool, opcional): Regrida conservativamente para a grade da referência
+            quando as grades diferem. Sem isso, mapas de grades diferentes são ignorados.
+        output_dir (str, opcional): Diretório de saída. Padrão é 'outputs/comparacao'.
+        figures_dir (str, opcional): Diretório dos mapas de diferença. Padrão é 'figures'.
+        n_threads (int, opcional): Número de threads. Padrão é um por dataset.
+        forcar_figuras (bool, opcional): Refaz os mapas de diferença mesmo sem mudanças.
+        sem_figuras (bool, opcional): Não gera os mapas de diferença.
+
+    Returns:
+        tuple: (tabela, diferencas). A tabela tem uma coluna por (variável, dataset),
+        alinhada por ano; diferencas mapeia o nome do dataset ao campo (dataset - referência).
+    """
+    nomes = list(datasets)
+    referencia = referencia or nomes[0]
+
+    with ThreadPoolExecutor(max_workers=n_threads or len(nomes)) as executor:
+        resultados = dict(zip(nomes, executor.map(lambda nome: _estatisticas_dataset(datasets[nome], geometria), nomes)))
+
+    # Tabela alinhada por ano (apenas os anos em comum a todos os datasets)
+    tabela = pd.concat({nome: resultados[nome][0] for nome in nomes}, axis=1, join='inner')
+    tabela = tabela.swaplevel(axis=1).sort_index(axis=1, level=0)
+    for variavel in tabela.columns.get_level_values(0).unique():
+        for nome in nomes:
+            if nome != referencia:
+                tabela[(variavel, f'{nome} - {referencia}')] = tabela[(variavel, nome)] - tabela[(variavel, referencia)]
+    tabela = tabela.sort_index(axis=1, level=0, sort_remaining=False)
+
+    campo_referencia = resultados[referencia][1]
+    diferencas = {}
+    for nome in nomes:
+        if nome == referencia:
+            continue
+        campo = resultados[nome][1]
+        mesma_grade = (campo['latitude'].size == campo_referencia['latitude'].size
+                       and campo['longitude'].size == campo_referencia['longitude'].size
+                       and np.allclose(campo['latitude'], campo_referencia['latitude'])
+                       and np.allclose(campo['longitude'], campo_referencia['longitude']))
+        if not mesma_grade:
+            if not regridar:
+                print(f"Aviso: {nome} está em outra grade; mapa de diferença ignorado (use regridar=True).")
+                continue
+            campo = regridar_conservativo(campo, campo_referencia['latitude'].values, campo_referencia['longitude'].values)
+        diferencas[nome] = (campo - campo_referencia).assign_attrs(referencia=referencia)
+
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+    nome_tabela = os.path.join(output_dir, 'comparacao_anual.csv')
+    tabela.to_csv(nome_tabela)
+    for nome, diferenca in diferencas.items():
+        diferenca.to_netcdf(os.path.join(output_dir, f'diferenca_{nome}_{referencia}.nc'))
+
+    if sem_figuras:
+        print(f"\nComparação entre datasets salva em: {output_dir}")
+        return tabela, diferencas
+
+    # Importado aqui para que as estatísticas não dependam do cartopy
+    from visualizacao import plot_difference_map
+    rotulos = {'t2m': ('Temperatura Média', 'Diferença de Temperatura (K)'),
+               'tp': ('Precipitação Média', 'Diferença de Precipitação (m)')}
+    if not os.path.exists(figures_dir):
+        os.makedirs(figures_dir)
+    for nome, diferenca in diferencas.items():
+        for variavel, (titulo, rotulo) in rotulos.items():
+            gerar_figura(plot_difference_map, diferenca[variavel], geometria,
+                         f'{titulo}: {nome} - {referencia}', rotulo,
+                         os.path.join(figures_dir, f'diferenca_{variavel}_{nome}_{referencia}.png'),
+                         forcar=forcar_figuras)
+    print(f"\nComparação entre datasets salva em: {output_dir}")
+    return tabela, diferencas
+
+if __name__ == "__main__":
+    import sys
+
+    # Uso: python comparacao.py ERA5=data ERA5-Land=data_land (cada diretório com data_0/data_1)
+    FORCAR_FIGURAS = '--forcar-figuras' in sys.argv
+    SEM_FIGURAS = '--sem-figuras' in sys.argv
+    datasets = {}
+    for argumento in sys.argv[1:]:
+        if argumento.startswith('--'):
+            continue
+        nome, data_dir = argumento.split('=', 1)
+        dados_temp, dados_precip = load_era5_data(data_dir)
+        dados_combinados = combine_era5_datasets(dados_temp, dados_precip)
+        if dados_combinados is not None:
+            datasets[nome] = dados_combinados
+
+    south_america_geometry = load_south_america_shapefile()
+    if datasets and south_america_geometry is not None:
+        tabela, diferencas = comparar_datasets(datasets, south_america_geometry,
+                                               forcar_figuras=FORCAR_FIGURAS, sem_figuras=SEM_FIGURAS)
+        print(tabela.describe())
+    else:
+        print("Erro: Informe ao menos um dataset no formato nome=diretorio.")
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo para decomposição sazonal em lote (tendência, sazonalidade e resíduo).
+
+Reproduz o método de médias móveis do statsmodels (seasonal_decompose) para
+uma matriz 2-D de séries de uma só vez: a tendência é uma média móvel
+centrada aplicada com janelas deslizantes, e a componente sazonal é a média
+de cada fase do período. Não gera figuras; a plotagem fica em visualizacao.py.
+
+@author: Gustavo Starling
+
+"""
+
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+# Mesmos nomes de atributos do DecomposeResult do statsmodels
+Decomposicao = namedtuple('Decomposicao', ['observed', 'trend', 'seasonal', 'resid'])
+
+# Média móvel centrada (2 x período quando o período é par), com NaN nas bordas
+def _media_movel_centrada(x, periodo):
+    if periodo % 2 == 0:
+        pesos = np.array([0.5] + [1.0] * (periodo - 1) + [0.5]) / periodo
+    else:
+        pesos = np.repeat(1.0 / periodo, periodo)
+
+    borda = (pesos.size - 1) // 2
+    tendencia = np.full(x.shape, np.nan)
+    if x.shape[1] >= pesos.size:
+        janelas = np.lib.stride_tricks.sliding_window_view(x, pesos.size, axis=1)
+        tendencia[:, borda:x.shape[1] - borda] = janelas @ pesos
+    return tendencia
+
+# Média de cada fase do período (ex.: cada mês do ano), ignorando NaN
+def _media_por_fase(x, periodo):
+    n_series, n_tempo = x.shape
+    n_ciclos = -(-n_tempo // periodo)
+    preenchido = np.full((n_series, n_ciclos * periodo), np.nan)
+    preenchido[:, :n_tempo] = x
+    return np.nanmean(preenchido.reshape(n_series, n_ciclos, periodo), axis=1)
+
+# Decompõe várias séries ao mesmo tempo
+def decompor_lote(series, periodo, modelo='additive', sazonal=True):
+    """
+    Decomposição por médias móveis de um lote de séries, em uma única chamada vetorizada.
+
+    Args:
+        series (np.ndarray ou pd.DataFrame): Matriz (n_series, n_tempo) ou DataFrame
+            com o tempo no índice e uma série por coluna.
+        periodo (int): Período sazonal (12 para dados mensais). Com sazonal=False,
+            é apenas o tamanho da janela da tendência.
+        modelo (str, opcional): 'additive' ou 'multiplicative'. Padrão é 'additive'.
+        sazonal (bool, opcional): Se False, não estima componente sazonal (séries anuais).
+
+    Returns:
+        Decomposicao: 'observed', 'trend', 'seasonal' e 'resid', no mesmo formato da entrada.
+    """
+    tabela = series if isinstance(series, pd.DataFrame) else None
+    x = np.atleast_2d(np.asarray(series.T if tabela is not None else series, dtype=float))
+    multiplicativo = modelo == 'multiplicative'
+
+    tendencia = _media_movel_centrada(x, periodo)
+    sem_tendencia = x / tendencia if multiplicativo else x - tendencia
+
+    if sazonal:
+        medias = _media_por_fase(sem_tendencia, periodo)
+        if multiplicativo:
+            medias /= medias.mean(axis=1, keepdims=True)
+        else:
+            medias -= medias.mean(axis=1, keepdims=True)
+        componente_sazonal = np.tile(medias, x.shape[1] // periodo + 1)[:, :x.shape[1]]
+    else:
+        componente_sazonal = np.ones_like(x) if multiplicativo else np.zeros_like(x)
+
+    residuo = x / componente_sazonal / tendencia if multiplicativo else sem_tendencia - componente_sazonal
+
+    componentes = (x, tendencia, componente_sazonal, residuo)
+    if tabela is not None:
+        componentes = [pd.DataFrame(c.T, index=tabela.index, columns=tabela.columns) for c in componentes]
+    return Decomposicao(*componentes)
+
+# Decompõe a série de cada célula da grade
+def decompor_cubo(dados, periodo=12, modelo='additive', sazonal=True):
+    """
+    Aplica decompor_lote a todas as células de um cubo ('valid_time', 'latitude', 'longitude').
+
+    Returns:
+        xr.Dataset: Variáveis 'trend', 'seasonal' e 'resid' com as dimensões do cubo.
+    """
+    dados = dados.transpose('valid_time', ...)
+    outras_dims = dados.shape[1:]
+    matriz = np.asarray(dados.values).reshape(dados.shape[0], -1).T
+    resultado = decompor_lote(matriz, periodo, modelo, sazonal)
+    return xr.Dataset({
+        nome: (dados.dims, getattr(resultado, nome).T.reshape((dados.shape[0],) + outras_dims))
+        for nome in ('trend', 'seasonal', 'resid')
+    }, coords=dados.coords)
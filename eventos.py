@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo para detecção de eventos extremos (ondas de calor e períodos secos).
+
+Os eventos são sequências de dias consecutivos em que a variável fica acima
+(ou abaixo) de um limiar em cada célula da grade. A detecção usa codificação
+por comprimento de sequência (run-length) vetorizada sobre o eixo do tempo e
+processa o cubo em blocos temporais, carregando o estado das sequências abertas
+de um bloco para o próximo.
+
+@author: Gustavo Starling
+
+"""
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+# Agrega o cubo horário em valores diários (máxima de t2m e acumulado de tp)
+def serie_diaria(dados_era5):
+    diario = dados_era5.resample(valid_time='1D')
+    return xr.Dataset({
+        't2m': diario.max()['t2m'],
+        'tp': diario.sum()['tp'],
+    })
+
+# Calcula o limiar percentil de cada célula da grade
+def limiar_percentil(dados, percentil=90):
+    return dados.quantile(percentil / 100, dim='valid_time').drop_vars('quantile')
+
+# Alinha o limiar aos dados pelas coordenadas (datas e células), e não pela posição
+def _alinhar_limiar(limiar, dados):
+    if not isinstance(limiar, xr.DataArray):
+        return limiar
+    dims = dados.dims if 'valid_time' in limiar.dims else dados.dims[1:]
+    if set(limiar.dims) != set(dims):
+        raise ValueError(f"Dimensões do limiar {limiar.dims} incompatíveis com os dados {dados.dims}")
+    try:
+        limiar = limiar.sel({dim: dados[dim] for dim in dims if dim in limiar.coords and dim in dados.coords})
+    except KeyError as erro:
+        raise ValueError(f"O limiar não cobre todas as datas ou células dos dados: {erro}") from erro
+    return limiar.transpose(*dims)
+
+# Seleciona o trecho do limiar correspondente a um bloco temporal
+def _limiar_do_bloco(limiar, inicio, fim, n_celulas):
+    if isinstance(limiar, xr.DataArray):
+        if 'valid_time' in limiar.dims:
+            return np.asarray(limiar.isel(valid_time=slice(inicio, fim)).values).reshape(fim - inicio, n_celulas)
+        return np.asarray(limiar.values).reshape(1, n_celulas)
+    limiar = np.asarray(limiar)
+    if limiar.ndim == 0:
+        return limiar
+    return limiar.reshape(-1, n_celulas)
+
+# Detecta sequências de dias consecutivos acima (ou abaixo) do limiar em cada célula
+def detectar_eventos(dados, limiar, acima=True, duracao_minima=3, tamanho_bloco=365):
+    """
+    Detecta eventos por célula usando run-length vetorizado, em blocos temporais.
+
+    Args:
+        dados (xr.DataArray): Série diária com dimensões ('valid_time', 'latitude', 'longitude').
+        limiar (float, np.ndarray ou xr.DataArray): Limiar escalar, por célula
+            ('latitude', 'longitude') ou por dia e célula (com 'valid_time'). Um xr.DataArray
+            é alinhado aos dados pelas coordenadas (ValueError se não cobrir todas as datas
+            e células); um np.ndarray segue a ordem ('valid_time', 'latitude', 'longitude').
+        acima (bool, opcional): True para eventos acima do limiar (calor), False para abaixo (seca).
+        duracao_minima (int, opcional): Número mínimo de dias consecutivos. Padrão é 3.
+        tamanho_bloco (int, opcional): Número de dias lidos por bloco. Padrão é 365.
+
+    Returns:
+        pd.DataFrame: Um evento por linha, com 'latitude', 'longitude', 'inicio',
+        'duracao' (dias) e 'intensidade' (soma do excesso sobre o limiar).
+    """
+    dados = dados.transpose('valid_time', 'latitude', 'longitude')
+    n_tempo, n_lat, n_lon = dados.shape
+    n_celulas = n_lat * n_lon
+    tempos = dados['valid_time'].values
+    limiar = _alinhar_limiar(limiar, dados)
+
+    # Estado das sequências ainda abertas ao fim do bloco anterior
+    ativo = np.zeros(n_celulas, dtype=bool)
+    inicio_aberto = np.zeros(n_celulas, dtype=np.int64)
+    intensidade_aberta = np.zeros(n_celulas)
+
+    celulas, inicios, duracoes, intensidades = [], [], [], []
+
+    for inicio_bloco in range(0, n_tempo, tamanho_bloco):
+        fim_bloco = min(inicio_bloco + tamanho_bloco, n_tempo)
+        n_bloco = fim_bloco - inicio_bloco
+        valores = np.asarray(dados.isel(valid_time=slice(inicio_bloco, fim_bloco)).values, dtype=float).reshape(n_bloco, n_celulas)
+        limiar_bloco = _limiar_do_bloco(limiar, inicio_bloco, fim_bloco, n_celulas)
+
+        excesso = valores - limiar_bloco if acima else limiar_bloco - valores
+        condicao = excesso > 0  # NaN nunca satisfaz a condição
+        excesso = np.where(condicao, excesso, 0.0)
+
+        # Soma acumulada do excesso para obter a intensidade de cada sequência em O(1)
+        acumulado = np.vstack([np.zeros((1, n_celulas)), np.cumsum(excesso, axis=0)])
+
+        # Transições 0->1 (início) e 1->0 (fim); a última linha fecha todas as sequências do bloco
+        estendido = np.vstack([ativo, condicao, np.zeros((1, n_celulas), dtype=bool)]).astype(np.int8)
+        transicoes = np.diff(estendido, axis=0)
+        linha_ini, celula_ini = np.nonzero(transicoes == 1)
+        linha_fim, celula_fim = np.nonzero(transicoes == -1)
+
+        # Sequências carregadas do bloco anterior começam antes do bloco (linha 0 virtual)
+        carregadas = np.nonzero(ativo)[0]
+        celula_ini = np.concatenate([carregadas, celula_ini])
+        linha_ini = np.concatenate([np.zeros(carregadas.size, dtype=linha_ini.dtype), linha_ini])
+        de_carry = np.concatenate([np.ones(carregadas.size, dtype=bool), np.zeros(linha_ini.size - carregadas.size, dtype=bool)])
+
+        # Ordena inícios e fins por célula e tempo para parear cada início com seu fim
+        ordem_ini = np.lexsort((~de_carry, linha_ini, celula_ini))
+        ordem_fim = np.lexsort((linha_fim, celula_fim))
+        celula = celula_ini[ordem_ini]
+        linha_ini, de_carry = linha_ini[ordem_ini], de_carry[ordem_ini]
+        linha_fim = linha_fim[ordem_fim]
+
+        parcial = acumulado[linha_fim, celula] - acumulado[linha_ini, celula]
+        inicio_global = np.where(de_carry, inicio_aberto[celula], inicio_bloco + linha_ini)
+        intensidade = parcial + np.where(de_carry, intensidade_aberta[celula], 0.0)
+        duracao = inicio_bloco + linha_fim - inicio_global
+
+        # Sequências que chegam ao fim do bloco continuam abertas no próximo
+        aberta = linha_fim == n_bloco
+        ativo[:] = False
+        ativo[celula[aberta]] = True
+        inicio_aberto[celula[aberta]] = inicio_global[aberta]
+        intensidade_aberta[celula[aberta]] = intensidade[aberta]
+
+        fechada = ~aberta
+        if fim_bloco == n_tempo:
+            fechada = np.ones_like(aberta)  # fim dos dados: fecha tudo
+        valida = fechada & (duracao >= duracao_minima)
+        celulas.append(celula[valida])
+        inicios.append(inicio_global[valida])
+        duracoes.append(duracao[valida])
+        intensidades.append(intensidade[valida])
+
+    celulas = np.concatenate(celulas) if celulas else np.array([], dtype=np.int64)
+    inicios = np.concatenate(inicios) if inicios else np.array([], dtype=np.int64)
+    indice_lat, indice_lon = np.unravel_index(celulas, (n_lat, n_lon))
+    return pd.DataFrame({
+        'latitude': dados['latitude'].values[indice_lat],
+        'longitude': dados['longitude'].values[indice_lon],
+        'inicio': tempos[inicios],
+        'duracao': np.concatenate(duracoes) if duracoes else np.array([], dtype=np.int64),
+        'intensidade': np.concatenate(intensidades) if intensidades else np.array([]),
+    })
+
+# Detecta ondas de calor: dias consecutivos acima do percentil da célula
+def ondas_de_calor(dados_diarios, percentil=90, duracao_minima=3, tamanho_bloco=365, limiar=None):
+    if limiar is None:
+        limiar = limiar_percentil(dados_diarios['t2m'], percentil)
+    return detectar_eventos(dados_diarios['t2m'], limiar, acima=True,
+                            duracao_minima=duracao_minima, tamanho_bloco=tamanho_bloco)
+
+# Detecta períodos secos: dias consecutivos com precipitação abaixo do limiar de dia seco (1 mm)
+def periodos_secos(dados_diarios, limiar_seco=0.001, duracao_minima=5, tamanho_bloco=365):
+    return detectar_eventos(dados_diarios['tp'], limiar_seco, acima=False,
+                            duracao_minima=duracao_minima, tamanho_bloco=tamanho_bloco)
+
+# Resume os eventos por célula da grade e por ano de início
+def resumir_eventos(eventos, dados):
+    """
+    Agrega os eventos em grade anual.
+
+    Args:
+        eventos (pd.DataFrame): Saída de detectar_eventos.
+        dados (xr.DataArray ou xr.Dataset): Dados de origem (fornece a grade de latitude/longitude).
+
+    Returns:
+        xr.Dataset: Com dimensões ('year', 'latitude', 'longitude') e variáveis
+        'numero_eventos', 'duracao_total', 'duracao_maxima', 'intensidade_total' e 'primeiro_inicio'.
+    """
+    eventos = eventos.assign(year=pd.to_datetime(eventos['inicio']).dt.year)
+    resumo = eventos.groupby(['year', 'latitude', 'longitude']).agg(
+        numero_eventos=('duracao', 'size'),
+        duracao_total=('duracao', 'sum'),
+        duracao_maxima=('duracao', 'max'),
+        intensidade_total=('intensidade', 'sum'),
+        primeiro_inicio=('inicio', 'min'),
+    )
+    resumo = resumo.to_xarray().reindex(latitude=dados['latitude'], longitude=dados['longitude'])
+    resumo['numero_eventos'] = resumo['numero_eventos'].fillna(0).astype(int)
+    return resumo
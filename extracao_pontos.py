@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo para extração de séries temporais do ERA5 em pontos de estações (ex.: INMET).
+
+Os índices da grade e os pesos de interpolação de todas as estações são
+calculados uma única vez; a leitura é feita com uma única indexação vetorizada
+(pontual) sobre o cubo, que continua preguiçosa (lazy) em arquivos grandes.
+
+@author: Gustavo Starling
+
+"""
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+# Localiza, para cada ponto, a célula inferior e a fração dentro do intervalo da grade
+def _posicao_na_grade(coordenadas, valores):
+    decrescente = coordenadas[0] > coordenadas[-1]
+    ordenadas = coordenadas[::-1] if decrescente else coordenadas
+
+    indice = np.clip(np.searchsorted(ordenadas, valores) - 1, 0, ordenadas.size - 2)
+    fracao = (valores - ordenadas[indice]) / (ordenadas[indice + 1] - ordenadas[indice])
+    fora = (valores < ordenadas[0]) | (valores > ordenadas[-1])
+
+    if decrescente:
+        # Converte de volta para a ordem original da coordenada
+        indice = ordenadas.size - 2 - indice
+        fracao = 1 - fracao
+    return indice, fracao, fora
+
+# Calcula os índices e pesos de interpolação de todas as estações
+def calcular_indices_pesos(latitudes_grade, longitudes_grade, latitudes, longitudes, metodo='nearest'):
+    """
+    Pré-calcula os vizinhos e pesos de cada ponto em uma grade regular.
+
+    Args:
+        latitudes_grade (np.ndarray): Latitudes da grade (crescentes ou decrescentes).
+        longitudes_grade (np.ndarray): Longitudes da grade.
+        latitudes (np.ndarray): Latitudes das estações.
+        longitudes (np.ndarray): Longitudes das estações.
+        metodo (str, opcional): 'nearest' (vizinho mais próximo) ou 'bilinear'. Padrão é 'nearest'.
+
+    Returns:
+        tuple: (indice_lat, indice_lon, pesos), cada um com forma (n_estacoes, n_vizinhos).
+        Pontos fora da grade recebem pesos NaN.
+    """
+    latitudes_grade = np.asarray(latitudes_grade, dtype=float)
+    longitudes_grade = np.asarray(longitudes_grade, dtype=float)
+    ilat, flat, fora_lat = _posicao_na_grade(latitudes_grade, np.asarray(latitudes, dtype=float))
+    ilon, flon, fora_lon = _posicao_na_grade(longitudes_grade, np.asarray(longitudes, dtype=float))
+    fora = fora_lat | fora_lon
+
+    if metodo == 'nearest':
+        indice_lat = (ilat + (flat >= 0.5))[:, None]
+        indice_lon = (ilon + (flon >= 0.5))[:, None]
+        pesos = np.ones((ilat.size, 1))
+    elif metodo == 'bilinear':
+        indice_lat = np.stack([ilat, ilat, ilat + 1, ilat + 1], axis=1)
+        indice_lon = np.stack([ilon, ilon + 1, ilon, ilon + 1], axis=1)
+        pesos = np.stack([(1 - flat) * (1 - flon), (1 - flat) * flon,
+                          flat * (1 - flon), flat * flon], axis=1)
+    else:
+        raise ValueError(f"Método de interpolação desconhecido: {metodo}")
+
+    pesos[fora] = np.nan
+    if fora.any():
+        print(f"Aviso: {int(fora.sum())} estação(ões) fora da grade; as séries serão NaN.")
+    return indice_lat, indice_lon, pesos
+
+# Extrai as séries de todas as estações em uma única leitura vetorizada
+def extrair_pontos(dados_era5, estacoes, metodo='nearest', variaveis=('t2m', 'tp'),
+                   coluna_id='codigo', coluna_lat='latitude', coluna_lon='longitude'):
+    """
+    Extrai as séries temporais de várias estações de uma só vez.
+
+    Args:
+        dados_era5 (xr.Dataset): Dataset (ex.: saída de spatial_subset) com 'latitude', 'longitude' e 'valid_time'.
+        estacoes (pd.DataFrame): Tabela com identificador, latitude e longitude das estações.
+        metodo (str, opcional): 'nearest' ou 'bilinear'. Padrão é 'nearest'.
+        variaveis (tuple, opcional): Variáveis a extrair. Padrão é ('t2m', 'tp').
+        coluna_id (str, opcional): Coluna com o código da estação. Padrão é 'codigo'.
+        coluna_lat (str, opcional): Coluna de latitude. Padrão é 'latitude'.
+        coluna_lon (str, opcional): Coluna de longitude. Padrão é 'longitude'.
+
+    Returns:
+        xr.Dataset: Variáveis com dimensões ('estacao', 'valid_time').
+    """
+    estacoes = pd.DataFrame(estacoes)
+    indice_lat, indice_lon, pesos = calcular_indices_pesos(
+        dados_era5['latitude'].values, dados_era5['longitude'].values,
+        estacoes[coluna_lat].values, estacoes[coluna_lon].values, metodo)
+
+    dims = ('estacao', 'vizinho')
+    seletor_lat = xr.DataArray(indice_lat, dims=dims)
+    seletor_lon = xr.DataArray(indice_lon, dims=dims)
+    pesos = xr.DataArray(pesos, dims=dims)
+
+    series = {}
+    for variavel in variaveis:
+        # Indexação pontual: lê apenas as células vizinhas de cada estação
+        vizinhos = dados_era5[variavel].isel(latitude=seletor_lat, longitude=seletor_lon)
+        vizinhos = vizinhos.drop_vars(['latitude', 'longitude'], errors='ignore')
+        series[variavel] = (vizinhos * pesos).sum(dim='vizinho', skipna=False).transpose('estacao', ...)
+
+    return xr.Dataset(series).assign_coords(
+        estacao=estacoes[coluna_id].values if coluna_id in estacoes else np.arange(len(estacoes)),
+        latitude_estacao=('estacao', estacoes[coluna_lat].values),
+        longitude_estacao=('estacao', estacoes[coluna_lon].values),
+    )
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo para estatísticas em janelas móveis sobre o cubo anual por célula.
+
+Normais climatológicas móveis (30 anos) e médias/desvios decadais (10 anos)
+são calculados para todos os anos e todas as janelas em uma única passada
+O(n) pelo eixo 'year': a cada ano o valor novo entra e o que saiu da janela
+é removido das somas (atualização de Welford para média e variância), em vez
+de refazer groupby/mean para cada janela.
+
+@author: Gustavo Starling
+
+"""
+
+import numpy as np
+import xarray as xr
+
+# Estado de Welford de uma janela: contagem, média e soma dos quadrados dos desvios
+def _novo_estado(formato):
+    return np.zeros(formato), np.zeros(formato), np.zeros(formato)
+
+# Inclui (sinal=+1) ou remove (sinal=-1) um ano das somas da janela; NaN são ignorados
+def _atualizar(estado, valores, sinal):
+    n, media, m2 = estado
+    validos = ~np.isnan(valores)
+    x = np.where(validos, valores, 0.0)
+
+    n_novo = n + sinal * validos
+    delta = np.where(validos, x - media, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media_nova = np.where(n_novo > 0, media + sinal * delta / n_novo, 0.0)
+    m2_novo = np.where(n_novo > 0, m2 + sinal * delta * (x - media_nova) * validos, 0.0)
+    return n_novo, media_nova, np.maximum(m2_novo, 0.0)
+
+# Janelas móveis de uma matriz (year, células), todas de uma vez
+def janelas_moveis(x, janelas, min_anos=None):
+    """
+    Média e desvio padrão amostral em janelas móveis terminando em cada ano.
+
+    Args:
+        x (np.ndarray): Matriz (n_anos, ...) com os valores anuais.
+        janelas (sequence): Tamanhos das janelas em anos (ex.: (30, 10)).
+        min_anos (dict, opcional): Mínimo de anos válidos por janela. Padrão é a janela completa.
+
+    Returns:
+        tuple: (medias, desvios, contagens), cada um com forma (len(janelas),) + x.shape.
+    """
+    x = np.asarray(x, dtype=float)
+    min_anos = min_anos or {}
+    formato = (len(janelas),) + x.shape
+    medias, desvios, contagens = np.full(formato, np.nan), np.full(formato, np.nan), np.zeros(formato)
+    estados = [_novo_estado(x.shape[1:]) for _ in janelas]
+
+    # Uma passada pelos anos: cada ano entra em todas as janelas e sai depois de 'janela' anos
+    for ano in range(x.shape[0]):
+        for i, janela in enumerate(janelas):
+            estados[i] = _atualizar(estados[i], x[ano], +1)
+            if ano >= janela:
+                estados[i] = _atualizar(estados[i], x[ano - janela], -1)
+
+            n, media, m2 = estados[i]
+            completa = n >= min_anos.get(janela, janela)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                medias[i, ano] = np.where(completa, media, np.nan)
+                desvios[i, ano] = np.where(completa & (n > 1), np.sqrt(m2 / (n - 1)), np.nan)
+            contagens[i, ano] = n
+
+    return medias, desvios, contagens
+
+# Aplica as janelas móveis a todas as variáveis do cubo anual
+def estatisticas_moveis(dados_anuais, janelas=(30, 10), ano_inicial=1970, min_anos=None):
+    """
+    Normais e estatísticas móveis por célula a partir do cubo anual.
+
+    Args:
+        dados_anuais (xr.Dataset): Cubo com dimensão 'year' (ex.: médias anuais de main11.py).
+        janelas (tuple, opcional): Tamanhos das janelas em anos. Padrão é (30, 10).
+        ano_inicial (int, opcional): Primeiro ano do resultado. Os anos anteriores só
+            alimentam as janelas. Padrão é 1970.
+        min_anos (dict, opcional): Mínimo de anos válidos por janela. Padrão é a janela completa.
+
+    Returns:
+        xr.Dataset: Para cada variável, '<var>_media' e '<var>_desvio' com dimensões
+        ('janela', 'year', ...), onde cada ano é o último da sua janela.
+    """
+    dados_anuais = dados_anuais.sortby('year')
+    resultado = {}
+    for nome, variavel in dados_anuais.data_vars.items():
+        variavel = variavel.transpose('year', ...)
+        medias, desvios, _ = janelas_moveis(variavel.values, janelas, min_anos)
+        dims = ('janela',) + variavel.dims
+        resultado[f'{nome}_media'] = (dims, medias, {'descricao': f'Média móvel de {nome}'})
+        resultado[f'{nome}_desvio'] = (dims, desvios, {'descricao': f'Desvio padrão móvel de {nome}'})
+
+    coords = {nome: coordenada for nome, coordenada in dados_anuais.coords.items()}
+    coords['janela'] = list(janelas)
+    estatisticas = xr.Dataset(resultado, coords=coords)
+    return estatisticas.sel(year=estatisticas['year'] >= ano_inicial)
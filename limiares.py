@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo para cálculo de limiares percentis por dia do ano (TX90p, ondas de calor).
+
+Para cada célula e cada dia do calendário, o limiar é o percentil das amostras
+de uma janela móvel de 5 dias centrada no dia, em todos os anos do período
+base (padrão 1961-1990). As janelas são montadas uma única vez por bloco de
+células e o percentil é obtido por ordenação parcial (np.partition), sem
+ordenar o vetor inteiro. O resultado é salvo em 'outputs/limiares' e
+reaproveitado enquanto os dados de entrada não mudarem.
+
+@author: Gustavo Starling
+
+"""
+
+import os
+import numpy as np
+import pandas as pd
+import xarray as xr
+from utilitarios import calcular_hash
+
+DIAS_ANO = 365
+
+# Converte datas em dia do ano de um calendário de 365 dias (29/02 vira 28/02)
+def dia_do_ano_365(tempos):
+    tempos = pd.DatetimeIndex(tempos)
+    dia = np.asarray(tempos.dayofyear)
+    return dia - (tempos.is_leap_year & (dia >= 60))
+
+# Percentil linear (mesmo método do np.percentile) via ordenação parcial ao longo do eixo 0
+def _percentil_parcial(amostras, percentil):
+    n = amostras.shape[0]
+    posicao = percentil / 100 * (n - 1)
+    inferior = int(np.floor(posicao))
+    superior = min(inferior + 1, n - 1)
+    fracao = posicao - inferior
+    parcial = np.partition(amostras, [inferior, superior], axis=0)
+    return parcial[inferior] + fracao * (parcial[superior] - parcial[inferior])
+
+# Calcula os limiares de um bloco de células já organizado em (ano, dia, célula)
+def _limiares_bloco(cubo, percentil, janela):
+    n_anos, _, n_celulas = cubo.shape
+    serie = cubo.reshape(n_anos * DIAS_ANO, n_celulas)
+    meia_janela = janela // 2
+
+    # Monta as janelas uma única vez: cada deslocamento é uma fatia da série contínua
+    preenchida = np.full((serie.shape[0] + 2 * meia_janela, n_celulas), np.nan, dtype=serie.dtype)
+    preenchida[meia_janela:meia_janela + serie.shape[0]] = serie
+    amostras = np.stack([
+        preenchida[meia_janela + desl:meia_janela + desl + serie.shape[0]].reshape(n_anos, DIAS_ANO, n_celulas)
+        for desl in range(-meia_janela, meia_janela + 1)
+    ]).reshape(janela * n_anos, DIAS_ANO, n_celulas)
+
+    limiares = np.empty((DIAS_ANO, n_celulas), dtype=serie.dtype)
+    completo = ~np.isnan(amostras).any(axis=(0, 2))
+    if completo.any():
+        limiares[completo] = _percentil_parcial(amostras[:, completo], percentil)
+    if (~completo).any():
+        # Bordas do período base ou células com falhas: caminho com NaN
+        limiares[~completo] = np.nanpercentile(amostras[:, ~completo], percentil, axis=0)
+    return limiares
+
+# Calcula (ou reaproveita do cache) os limiares percentis por dia do ano
+def limiares_dia_do_ano(dados, percentil=90, janela=5, periodo_base=(1961, 1990),
+                        output_dir='outputs/limiares', tamanho_bloco_celulas=256):
+    """
+    Calcula o percentil por célula e dia do ano com janela móvel sobre o período base.
+
+    Args:
+        dados (xr.DataArray): Série diária com dimensões ('valid_time', 'latitude', 'longitude').
+            Dados horários devem ser agregados antes (ver eventos.serie_diaria).
+        percentil (float, opcional): Percentil desejado. Padrão é 90.
+        janela (int, opcional): Tamanho (ímpar) da janela móvel em dias. Padrão é 5.
+        periodo_base (tuple, opcional): Anos inicial e final do período base. Padrão é (1961, 1990).
+        output_dir (str, opcional): Diretório do cache. Padrão é 'outputs/limiares'.
+        tamanho_bloco_celulas (int, opcional): Número de células processadas por vez.
+
+    Returns:
+        xr.DataArray: Limiares com dimensões ('dayofyear', 'latitude', 'longitude'), dia 1 a 365.
+    """
+    ano_inicial, ano_final = periodo_base
+    base = dados.sel(valid_time=slice(f'{ano_inicial}-01-01', f'{ano_final}-12-31'))
+    base = base.transpose('valid_time', 'latitude', 'longitude')
+    tempos = pd.DatetimeIndex(base['valid_time'].values)
+    if tempos.normalize().has_duplicates:
+        print("Erro: Os limiares por dia do ano exigem dados diários (um valor por dia).")
+        return None
+    if tempos.empty:
+        print(f"Erro: Os dados não cobrem o período base {ano_inicial}-{ano_final}.")
+        return None
+    anos_ausentes = sorted(set(range(ano_inicial, ano_final + 1)) - set(tempos.year))
+    if anos_ausentes:
+        print(f"Erro: Anos do período base ausentes nos dados: {anos_ausentes}.")
+        return None
+
+    nome = dados.name or 'variavel'
+    caminho = os.path.join(output_dir, f'limiar_{nome}_p{percentil:g}_j{janela}_{ano_inicial}-{ano_final}.nc')
+    hash_entrada = calcular_hash(base, percentil=percentil, janela=janela)
+    if os.path.exists(caminho):
+        with xr.open_dataarray(caminho) as em_cache:
+            if em_cache.attrs.get('hash_entrada') == hash_entrada:
+                print(f"Limiares carregados do cache: {caminho}")
+                return em_cache.load()
+
+    # Organiza a série em (ano, dia do ano, célula), descartando 29/02 do período base
+    sem_bissexto = ~((tempos.month == 2) & (tempos.day == 29))
+    tempos = tempos[sem_bissexto]
+    anos = np.asarray(tempos.year)
+    indice_ano = anos - anos.min()
+    indice_dia = dia_do_ano_365(tempos) - 1
+    n_anos = indice_ano.max() + 1
+    n_lat, n_lon = base.sizes['latitude'], base.sizes['longitude']
+    n_celulas = n_lat * n_lon
+
+    valores = np.asarray(base.values[sem_bissexto], dtype=np.float32).reshape(-1, n_celulas)
+    limiares = np.empty((DIAS_ANO, n_celulas), dtype=np.float32)
+    for inicio in range(0, n_celulas, tamanho_bloco_celulas):
+        fim = min(inicio + tamanho_bloco_celulas, n_celulas)
+        cubo = np.full((n_anos, DIAS_ANO, fim - inicio), np.nan, dtype=np.float32)
+        cubo[indice_ano, indice_dia] = valores[:, inicio:fim]
+        limiares[:, inicio:fim] = _limiares_bloco(cubo, percentil, janela)
+
+    resultado = xr.DataArray(
+        limiares.reshape(DIAS_ANO, n_lat, n_lon),
+        dims=('dayofyear', 'latitude', 'longitude'),
+        coords={'dayofyear': np.arange(1, DIAS_ANO + 1), 'latitude': base['latitude'], 'longitude': base['longitude']},
+        name=f'{nome}_p{percentil:g}',
+        attrs={'percentil': percentil, 'janela': janela, 'periodo_base': f'{ano_inicial}-{ano_final}',
+               'hash_entrada': hash_entrada},
+    )
+
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+    resultado.to_netcdf(caminho)
+    print(f"Limiares por dia do ano salvos em: {caminho}")
+    return resultado
+
+# Expande os limiares por dia do ano para o eixo de tempo dos dados
+def limiar_no_tempo(limiares, tempos):
+    """
+    Retorna o limiar de cada data, pronto para eventos.detectar_eventos.
+
+    Args:
+        limiares (xr.DataArray): Saída de limiares_dia_do_ano.
+        tempos (array-like): Datas ('valid_time') dos dados diários.
+
+    Returns:
+        xr.DataArray: Limiares com dimensões ('valid_time', 'latitude', 'longitude').
+    """
+    dias = xr.DataArray(dia_do_ano_365(tempos), dims='valid_time', coords={'valid_time': np.asarray(tempos)})
+    return limiares.sel(dayofyear=dias).drop_vars('dayofyear')
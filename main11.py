@@ -9,17 +9,30 @@ Script principal para análise e visualização de dados climáticos ERA5 para a
 """
 
 import os
+import sys
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np # Importando numpy aqui, caso não esteja no visualizacao
-import statsmodels.api as sm
 from scipy.stats import linregress
 from process_era5 import load_era5_data, combine_era5_datasets, load_south_america_shapefile, spatial_subset
+from piramide import construir_piramide, carregar_piramide
+from utilitarios import calcular_hash
+from cache_figuras import gerar_figura
+from paralelo import agregar_por_ano
+from decomposicao import decompor_lote
+from janelas_moveis import estatisticas_moveis
+from checkpoints import identificar_fontes, checkpoint_valido, carregar_checkpoint, salvar_checkpoint, executar_com_checkpoint
 from visualizacao import (
     plot_annual_max_temperature_maps,
     plot_annual_line_graph,
     plot_annual_histogram,
-    plot_annual_scatter
+    plot_annual_scatter,
+    plot_seasonal_decomposition,
+    plot_annual_decomposition,
+    plot_monthly_boxplot,
+    plot_annual_trend,
+    plot_annual_time_series,
+    plot_monthly_seasonality
 )
 
 # Gera boxplot anual (estilo matplotlib)
@@ -50,6 +63,17 @@ def plot_annual_boxplot(anos, dados, titulo, xlabel, ylabel, filename, color='gr
     plt.close()
 
 if __name__ == "__main__":
+    # Com --paralelo, as agregações mensais e anuais são feitas por ano em vários processos
+    PARALELO = '--paralelo' in sys.argv
+
+    # Com --resume, fatias e etapas com checkpoint válido não são recalculadas
+    RETOMAR = '--resume' in sys.argv
+
+    # --forcar-figuras refaz todas as figuras; --sem-figuras calcula apenas os números
+    FORCAR_FIGURAS = '--forcar-figuras' in sys.argv
+    SEM_FIGURAS = '--sem-figuras' in sys.argv
+    opcoes_figuras = {'forcar': FORCAR_FIGURAS, 'sem_figuras': SEM_FIGURAS}
+
     # Carregamento dos Dados
     print("Carregando os dados do ERA5...")
     dados1, dados2 = load_era5_data()
@@ -70,10 +94,19 @@ if __name__ == "__main__":
         print("Realizando o recorte espacial dos dados para a Região Sul...")
         dados_recortados = spatial_subset(dados_combinados, south_america_geometry)
 
+        # Chave dos checkpoints: arquivos de origem (caminho, tamanho, data) e recorte, sem ler os valores
+        chave_entrada = calcular_hash(identificar_fontes(dados1, dados2), south_america_geometry.wkb)
+
     # --------------------- # Cálculo das Médias Mensais e Criação do DataFrame Mensal # ---------------------
     if dados_recortados is not None:
         print("\nAgrupando os dados por mês e ano e calculando as médias regionais...")
-        dados_mensais = dados_recortados.resample(valid_time='1M').mean()
+        data_inicio = np.datetime64('1940-01-01')
+        data_fim = np.datetime64('2024-12-31')
+        # A agregação é feita ano a ano e cada ano vira um checkpoint; com --resume os anos
+        # já concluídos são lidos de volta em vez de recalculados
+        dados_mensais, dados_anuais, dados_anuais_max_temporal = agregar_por_ano(
+            dados_recortados, periodo_anual=(data_inicio, data_fim), n_processos=None if PARALELO else 1,
+            retomar=RETOMAR, chave_entrada=chave_entrada)
         print("\nDimensões de dados_mensais:", dados_mensais.dims)
         print("Coordenadas de dados_mensais:", dados_mensais.coords)
 
@@ -108,17 +141,11 @@ if __name__ == "__main__":
         print(f"\nTabela de estatísticas mensais salva em '{nome_arquivo_mensal}'")
 
         # *** Bloco para recorte temporal (se você quiser manter) ***
-        data_inicio = np.datetime64('1940-01-01')
-        data_fim = np.datetime64('2024-12-31')
         dados_recortados_temporal = dados_recortados.sel(valid_time=slice(data_inicio, data_fim))
         print("\nDados recortados para o período de 1940-01-01 até 2024-12-31 (para análise anual).")
         print("Anos presentes nos dados recortados (para análise anual):", np.unique(dados_recortados_temporal['valid_time'].dt.year.values))
 
-        # Agrupamento Anual e Cálculo de Estatísticas (use 'dados_recortados_temporal' daqui para baixo)
-        print("Agrupando os dados por ano e calculando as médias e máximas...")
-        dados_anuais = dados_recortados_temporal.groupby(dados_recortados_temporal['valid_time'].dt.year).mean(dim='valid_time')
-        dados_anuais_max_temporal = dados_recortados_temporal.groupby(dados_recortados_temporal['valid_time'].dt.year).max(dim='valid_time')
-
+        # Estatísticas anuais (dados_anuais e dados_anuais_max_temporal já vêm de agregar_por_ano)
         # Calcula a média espacial da temperatura média e da precipitação nos dados anuais
         temperatura_media_anual_regional = dados_anuais['t2m'].mean(dim=['latitude', 'longitude'])
         precipitacao_media_anual_regional = dados_anuais['tp'].mean(dim=['latitude', 'longitude'])
@@ -204,123 +231,49 @@ if __name__ == "__main__":
         estatisticas_anuais_df.to_csv(nome_arquivo_estatisticas, index=False)
         print(f"\nTabela de estatísticas descritivas anuais salva em '{nome_arquivo_estatisticas}'")
 
+        # --------------------- # Normais Móveis e Estatísticas Decadais # ---------------------
+
+        # Normais de 30 anos e médias/desvios de 10 anos por célula, para cada ano a partir de 1970
+        estatisticas_moveis_anuais = executar_com_checkpoint(
+            'estatisticas_moveis',
+            calcular_hash(chave_entrada, periodo_anual=(data_inicio, data_fim), janelas=(30, 10), ano_inicial=1970),
+            estatisticas_moveis, dados_anuais[['t2m', 'tp']], janelas=(30, 10), ano_inicial=1970, retomar=RETOMAR)
+        nome_arquivo_moveis = os.path.join(output_dir, 'estatisticas_moveis.nc')
+        estatisticas_moveis_anuais.to_netcdf(nome_arquivo_moveis)
+        print(f"\nNormais móveis (30 anos) e estatísticas decadais (10 anos) salvas em '{nome_arquivo_moveis}'")
+
         # --------------------- # Decomposição da Série Temporal Anual # ---------------------
         
-        # Garanta que 'Ano' seja o índice para a precipitação
-        precip_anual_ts = estatisticas_anuais_df.set_index('Ano')['Precipitação Média Anual (m)']
-        
-        # Modelo de decomposição aditivo (a frequência seasonal é ignorada para dados anuais)
-        decomposicao_precip = sm.tsa.seasonal_decompose(precip_anual_ts, model='additive', period=1) # period=1 para indicar que não há sazonalidade dentro do período
-        
+        # Decomposição aditiva em lote das séries anuais. Dados anuais não têm sazonalidade,
+        # então a tendência é uma média móvel centrada de 10 anos e o resíduo é o restante
+        series_anuais_ts = estatisticas_anuais_df.set_index('Ano')[['Precipitação Média Anual (m)', 'Temperatura Média Anual (°C)']]
+        decomposicao_anual = decompor_lote(series_anuais_ts, periodo=10, sazonal=False)
+
         # Extrair os componentes
-        tendencia_precip = decomposicao_precip.trend
-        residual_precip = decomposicao_precip.resid
+        precip_anual_ts = series_anuais_ts['Precipitação Média Anual (m)']
+        tendencia_precip = decomposicao_anual.trend['Precipitação Média Anual (m)']
+        residual_precip = decomposicao_anual.resid['Precipitação Média Anual (m)']
         
         # Plotar os componentes da precipitação
-        plt.figure(figsize=(12, 8))
-        
-        plt.subplot(3, 1, 1)
-        plt.plot(precip_anual_ts, label='Série Original da Precipitação')
-        plt.legend(loc='upper left')
-        plt.title('Decomposição da Série Temporal da Precipitação Média Anual')
+        gerar_figura(plot_annual_decomposition, precip_anual_ts, tendencia_precip, residual_precip, 'Precipitação',
+                     'Decomposição da Série Temporal da Precipitação Média Anual',
+                     'figures/decomposicao_precipitacao_anual.png', **opcoes_figuras)
         
-        plt.subplot(3, 1, 2)
-        plt.plot(tendencia_precip, label='Tendência da Precipitação')
-        plt.legend(loc='upper left')
-        plt.title('Tendência da Precipitação')
-        
-        plt.subplot(3, 1, 3)
-        plt.plot(residual_precip, label='Resíduo da Precipitação')
-        plt.legend(loc='upper left')
-        plt.title('Resíduo da Precipitação')
-        
-        plt.tight_layout()
-        plt.savefig('figures/decomposicao_precipitacao_anual.png')
-        plt.close()
-        
-        print("\nGráfico de decomposição da precipitação média anual salvo em 'figures/decomposicao_precipitacao_anual.png'")
+        if not SEM_FIGURAS:
+            print("\nGráfico de decomposição da precipitação média anual salvo em 'figures/decomposicao_precipitacao_anual.png'")
         
         # Repetindo o processo para a temperatura média anual
-        temp_anual_ts = estatisticas_anuais_df.set_index('Ano')['Temperatura Média Anual (°C)']
-        
-        decomposicao_temp = sm.tsa.seasonal_decompose(temp_anual_ts, model='additive', period=1)
-        
-        tendencia_temp = decomposicao_temp.trend
-        residual_temp = decomposicao_temp.resid
-        
-        plt.figure(figsize=(12, 8))
-        
-        plt.subplot(3, 1, 1)
-        plt.plot(temp_anual_ts, label='Série Original da Temperatura')
-        plt.legend(loc='upper left')
-        plt.title('Decomposição da Série Temporal da Temperatura Média Anual')
+        temp_anual_ts = series_anuais_ts['Temperatura Média Anual (°C)']
+        tendencia_temp = decomposicao_anual.trend['Temperatura Média Anual (°C)']
+        residual_temp = decomposicao_anual.resid['Temperatura Média Anual (°C)']
         
-        plt.subplot(3, 1, 2)
-        plt.plot(tendencia_temp, label='Tendência da Temperatura')
-        plt.legend(loc='upper left')
-        plt.title('Tendência da Temperatura')
+        gerar_figura(plot_annual_decomposition, temp_anual_ts, tendencia_temp, residual_temp, 'Temperatura',
+                     'Decomposição da Série Temporal da Temperatura Média Anual',
+                     'figures/decomposicao_temperatura_anual.png', **opcoes_figuras)
         
-        plt.subplot(3, 1, 3)
-        plt.plot(residual_temp, label='Resíduo da Temperatura')
-        plt.legend(loc='upper left')
-        plt.title('Resíduo da Temperatura')
-        
-        plt.tight_layout()
-        plt.savefig('figures/decomposicao_temperatura_anual.png')
-        plt.close()
-        
-        print("\nGráfico de decomposição da temperatura média anual salvo em 'figures/decomposicao_temperatura_anual.png'")
-
-     # --------------------- # Criação dos Gráficos de Linha Anuais # ---------------------
-     
-        print("\nCriando os gráficos de linha anuais...")
-        plot_annual_line_graph(anos, temperatura_media_anual_celsius,
-                                'Temperatura Média Anual na Região Sul (1940-2025)',
-                                'Ano', 'Temperatura (°C)', 'figures/temperatura_media_anual_regiao_sul.png')
-
-        plot_annual_line_graph(anos, temperatura_maxima_anual_celsius,
-                                'Temperatura Máxima Anual na Região Sul (1940-2025)',
-                                'Ano', 'Temperatura (°C)', 'figures/temperatura_maxima_anual_regiao_sul.png', color='red')
-
-        plot_annual_line_graph(anos, precipitacao_media_anual_regional,
-                                'Precipitação Média Anual na Região Sul (1940-2025)',
-                                'Ano', 'Precipitação (m)', 'figures/precipitacao_media_anual_regiao_sul.png')
-
-        # Gráfico de Linha da Precipitação Máxima Anual
-        plot_annual_line_graph(anos, estatisticas_precip_max_anual_df['Precipitação Máxima Anual (m)'].values,
-                                'Precipitação Máxima Anual na Região Sul (1940-2025)',
-                                'Ano', 'Precipitação (m)', 'figures/precipitacao_maxima_anual_regiao_sul.png', color='green')
+        if not SEM_FIGURAS:
+            print("\nGráfico de decomposição da temperatura média anual salvo em 'figures/decomposicao_temperatura_anual.png'")
 
-        # --------------------- # Criação dos Boxplots Anuais # ---------------------
-        
-        print("\nCriando os boxplots anuais...")
-        anos_filtrados_boxplot = anos[::5]
-        temp_media_filtrada_boxplot = temperatura_media_anual_celsius.values[::5]
-        temp_max_filtrada_boxplot = temperatura_maxima_anual_celsius.values[::5]
-        precip_filtrada_boxplot = precipitacao_media_anual_regional.values[::5]
-        precip_max_filtrada_boxplot = estatisticas_precip_max_anual_df['Precipitação Máxima Anual (m)'].values[::5]
-
-        plot_annual_boxplot(anos_filtrados_boxplot, temp_media_filtrada_boxplot,
-                             'Distribuição da Temperatura Média Anual na Região Sul (A cada 5 anos)',
-                             'Ano', 'Temperatura (°C)', 'figures/boxplot_temperatura_anual_5anos_regiao_sul.png')
-
-        plot_annual_boxplot(anos_filtrados_boxplot, temp_max_filtrada_boxplot,
-                             'Distribuição da Temperatura Máxima Anual na Região Sul (A cada 5 anos)',
-                             'Ano', 'Temperatura Máxima (°C)', 'figures/boxplot_temperatura_maxima_anual_5anos_regiao_sul.png')
-
-        plot_annual_boxplot(anos_filtrados_boxplot, precip_filtrada_boxplot,
-                             'Distribuição da Precipitação Média Anual na Região Sul (A cada 5 anos)',
-                             'Ano', 'Precipitação (m)', 'figures/boxplot_precipitacao_anual_5anos_regiao_sul.png')
-
-        # Boxplot da Precipitação Máxima Anual
-        plot_annual_boxplot(anos_filtrados_boxplot, precip_max_filtrada_boxplot,
-                             'Distribuição da Precipitação Máxima Anual na Região Sul (A cada 5 anos)',
-                             'Ano', 'Precipitação Máxima (m)', 'figures/boxplot_precipitacao_maxima_anual_5anos_regiao_sul.png', color='green')
-
-  # ---------------------------------- # Criação dos Boxplots Mensais # ----------------------------------
-        
-        print("\nCriando os boxplots mensais...")
-        
         # Carregar os dados mensais novamente
         nome_arquivo_mensal = os.path.join(nome_pasta_outputs, 'estatisticas_mensais.csv')
         try:
@@ -330,74 +283,132 @@ if __name__ == "__main__":
             exit()
         
         nome_pasta_figures = "figures"
-        # Boxplot da Temperatura Média Mensal
-        plt.figure(figsize=(12, 6))
-        estatisticas_mensais_df.boxplot(column='Temperatura Média Mensal (°C)', by='Mês')
-        plt.title('Distribuição da Temperatura Média Mensal na Região Sul')
-        plt.suptitle('') # Remover o título padrão do pandas
-        plt.xlabel('Mês')
-        plt.ylabel('Temperatura Média (°C)')
-        nome_arquivo_boxplot_temp_mensal = os.path.join(nome_pasta_figures, 'boxplot_temperatura_mensal_regiao_sul.png')
-        plt.savefig(nome_arquivo_boxplot_temp_mensal)
-        plt.close()
-        print(f"\nBoxplot da temperatura média mensal salvo em '{nome_pasta_figures}'.")
+
+        # Seções apenas de figuras: puladas por inteiro com --sem-figuras
+        if not SEM_FIGURAS:
+            # --------------------- # Criação dos Gráficos de Linha Anuais # ---------------------
+     
+            print("\nCriando os gráficos de linha anuais...")
+            gerar_figura(plot_annual_line_graph, anos, temperatura_media_anual_celsius,
+                         'Temperatura Média Anual na Região Sul (1940-2025)',
+                         'Ano', 'Temperatura (°C)', 'figures/temperatura_media_anual_regiao_sul.png', **opcoes_figuras)
+
+            gerar_figura(plot_annual_line_graph, anos, temperatura_maxima_anual_celsius,
+                         'Temperatura Máxima Anual na Região Sul (1940-2025)',
+                         'Ano', 'Temperatura (°C)', 'figures/temperatura_maxima_anual_regiao_sul.png', color='red', **opcoes_figuras)
+
+            gerar_figura(plot_annual_line_graph, anos, precipitacao_media_anual_regional,
+                         'Precipitação Média Anual na Região Sul (1940-2025)',
+                         'Ano', 'Precipitação (m)', 'figures/precipitacao_media_anual_regiao_sul.png', **opcoes_figuras)
+
+            # Gráfico de Linha da Precipitação Máxima Anual
+            gerar_figura(plot_annual_line_graph, anos, estatisticas_precip_max_anual_df['Precipitação Máxima Anual (m)'].values,
+                         'Precipitação Máxima Anual na Região Sul (1940-2025)',
+                         'Ano', 'Precipitação (m)', 'figures/precipitacao_maxima_anual_regiao_sul.png', color='green', **opcoes_figuras)
+
+            # --------------------- # Criação dos Boxplots Anuais # ---------------------
+        
+            print("\nCriando os boxplots anuais...")
+            anos_filtrados_boxplot = anos[::5]
+            temp_media_filtrada_boxplot = temperatura_media_anual_celsius.values[::5]
+            temp_max_filtrada_boxplot = temperatura_maxima_anual_celsius.values[::5]
+            precip_filtrada_boxplot = precipitacao_media_anual_regional.values[::5]
+            precip_max_filtrada_boxplot = estatisticas_precip_max_anual_df['Precipitação Máxima Anual (m)'].values[::5]
+
+            gerar_figura(plot_annual_boxplot, anos_filtrados_boxplot, temp_media_filtrada_boxplot,
+                         'Distribuição da Temperatura Média Anual na Região Sul (A cada 5 anos)',
+                         'Ano', 'Temperatura (°C)', 'figures/boxplot_temperatura_anual_5anos_regiao_sul.png', **opcoes_figuras)
+
+            gerar_figura(plot_annual_boxplot, anos_filtrados_boxplot, temp_max_filtrada_boxplot,
+                         'Distribuição da Temperatura Máxima Anual na Região Sul (A cada 5 anos)',
+                         'Ano', 'Temperatura Máxima (°C)', 'figures/boxplot_temperatura_maxima_anual_5anos_regiao_sul.png', **opcoes_figuras)
+
+            gerar_figura(plot_annual_boxplot, anos_filtrados_boxplot, precip_filtrada_boxplot,
+                         'Distribuição da Precipitação Média Anual na Região Sul (A cada 5 anos)',
+                         'Ano', 'Precipitação (m)', 'figures/boxplot_precipitacao_anual_5anos_regiao_sul.png', **opcoes_figuras)
+
+            # Boxplot da Precipitação Máxima Anual
+            gerar_figura(plot_annual_boxplot, anos_filtrados_boxplot, precip_max_filtrada_boxplot,
+                         'Distribuição da Precipitação Máxima Anual na Região Sul (A cada 5 anos)',
+                         'Ano', 'Precipitação Máxima (m)', 'figures/boxplot_precipitacao_maxima_anual_5anos_regiao_sul.png', color='green', **opcoes_figuras)
+
+            # ---------------------------------- # Criação dos Boxplots Mensais # ----------------------------------
         
-        # Boxplot da Precipitação Média Mensal
-        plt.figure(figsize=(12, 6))
-        estatisticas_mensais_df.boxplot(column='Precipitação Média Mensal (m)', by='Mês')
-        plt.title('Distribuição da Precipitação Média Mensal na Região Sul')
-        plt.suptitle('') # Remover o título padrão do pandas
-        plt.xlabel('Mês')
-        plt.ylabel('Precipitação Média (m)')
-        nome_arquivo_boxplot_prec_mensal = os.path.join(nome_pasta_figures, 'boxplot_precipitacao_mensal_regiao_sul.png')
-        plt.savefig(nome_arquivo_boxplot_prec_mensal)
-        plt.close()
-        print(f"Boxplot da precipitação média mensal salvo em '{nome_pasta_figures}'.")
+            print("\nCriando os boxplots mensais...")
+            # Boxplot da Temperatura Média Mensal
+            nome_arquivo_boxplot_temp_mensal = os.path.join(nome_pasta_figures, 'boxplot_temperatura_mensal_regiao_sul.png')
+            gerar_figura(plot_monthly_boxplot, estatisticas_mensais_df[['Mês', 'Temperatura Média Mensal (°C)']],
+                         'Temperatura Média Mensal (°C)', 'Distribuição da Temperatura Média Mensal na Região Sul',
+                         'Temperatura Média (°C)', nome_arquivo_boxplot_temp_mensal, **opcoes_figuras)
+            print(f"\nBoxplot da temperatura média mensal salvo em '{nome_pasta_figures}'.")
+        
+            # Boxplot da Precipitação Média Mensal
+            nome_arquivo_boxplot_prec_mensal = os.path.join(nome_pasta_figures, 'boxplot_precipitacao_mensal_regiao_sul.png')
+            gerar_figura(plot_monthly_boxplot, estatisticas_mensais_df[['Mês', 'Precipitação Média Mensal (m)']],
+                         'Precipitação Média Mensal (m)', 'Distribuição da Precipitação Média Mensal na Região Sul',
+                         'Precipitação Média (m)', nome_arquivo_boxplot_prec_mensal, **opcoes_figuras)
+            print(f"Boxplot da precipitação média mensal salvo em '{nome_pasta_figures}'.")
                         
-       # --------------------- # Criação dos Histogramas Anuais # ---------------------
+            # --------------------- # Criação dos Histogramas Anuais # ---------------------
         
-        print("\nCriando os histogramas anuais...")
-        plot_annual_histogram(estatisticas_anuais_df['Temperatura Média Anual (°C)'],
-                                'Histograma da Temperatura Média Anual na Região Sul (1940-2025)',
-                                'Temperatura Média Anual (°C)', 'Frequência',
-                                'figures/histograma_temperatura_media_anual_regiao_sul.png')
+            print("\nCriando os histogramas anuais...")
+            gerar_figura(plot_annual_histogram, estatisticas_anuais_df['Temperatura Média Anual (°C)'],
+                         'Histograma da Temperatura Média Anual na Região Sul (1940-2025)',
+                         'Temperatura Média Anual (°C)', 'Frequência',
+                         'figures/histograma_temperatura_media_anual_regiao_sul.png', **opcoes_figuras)
         
-        plot_annual_histogram(estatisticas_anuais_df['Temperatura Máxima Anual (°C)'],
-                                'Histograma da Temperatura Máxima Anual na Região Sul (1940-2025)',
-                                'Temperatura Máxima Anual (°C)', 'Frequência',
-                                'figures/histograma_temperatura_maxima_anual_regiao_sul.png', color='red')
+            gerar_figura(plot_annual_histogram, estatisticas_anuais_df['Temperatura Máxima Anual (°C)'],
+                         'Histograma da Temperatura Máxima Anual na Região Sul (1940-2025)',
+                         'Temperatura Máxima Anual (°C)', 'Frequência',
+                         'figures/histograma_temperatura_maxima_anual_regiao_sul.png', color='red', **opcoes_figuras)
         
-        plot_annual_histogram(estatisticas_anuais_df['Precipitação Média Anual (m)'],
-                                'Histograma da Precipitação Média Anual na Região Sul (1940-2025)',
-                                'Precipitação Média Anual (m)', 'Frequência',
-                                'figures/histograma_precipitacao_anual_regiao_sul.png')
+            gerar_figura(plot_annual_histogram, estatisticas_anuais_df['Precipitação Média Anual (m)'],
+                         'Histograma da Precipitação Média Anual na Região Sul (1940-2025)',
+                         'Precipitação Média Anual (m)', 'Frequência',
+                         'figures/histograma_precipitacao_anual_regiao_sul.png', **opcoes_figuras)
         
-        # ADICIONE ESTA LINHA:
-        plot_annual_histogram(estatisticas_anuais_df['Precipitação Máxima Anual (m)'],
-                                'Histograma da Precipitação Máxima Anual na Região Sul (1940-2025)',
-                                'Precipitação Máxima Anual (m)', 'Frequência',
-                                'figures/histograma_precipitacao_maxima_anual_regiao_sul.png', color='green')
+            # ADICIONE ESTA LINHA:
+            gerar_figura(plot_annual_histogram, estatisticas_anuais_df['Precipitação Máxima Anual (m)'],
+                         'Histograma da Precipitação Máxima Anual na Região Sul (1940-2025)',
+                         'Precipitação Máxima Anual (m)', 'Frequência',
+                         'figures/histograma_precipitacao_maxima_anual_regiao_sul.png', color='green', **opcoes_figuras)
 
-        # --------------------- # Criação dos Mapas de Temperatura Máxima Anual # ---------------------
+            # --------------------- # Criação dos Mapas de Temperatura Máxima Anual # ---------------------
         
-        print("\nCriando os mapas de temperatura máxima anual...")
-        anos_para_mapa = [1940, 1950, 1960, 1970, 1980, 1990, 2000, 2005, 2010, 2015, 2020, 2024]
-        plot_annual_max_temperature_maps(dados_recortados, south_america_geometry, anos_para_mapa)
-
-        # --------------------- # Criação dos Gráficos de Dispersão Anuais # ---------------------
+            print("\nCriando os mapas de temperatura máxima anual...")
+            anos_para_mapa = [1940, 1950, 1960, 1970, 1980, 1990, 2000, 2005, 2010, 2015, 2020, 2024]
+
+            # A pirâmide só é construída se algum mapa precisar ser refeito
+            fatores_piramide = (2, 4, 8)
+
+            def montar_piramide():
+                hash_piramide = calcular_hash(chave_entrada, fatores=fatores_piramide)
+                if RETOMAR and checkpoint_valido('piramide', hash_piramide):
+                    print("Checkpoint válido, etapa retomada: piramide")
+                    niveis_piramide = carregar_checkpoint('piramide')
+                else:
+                    niveis_piramide = construir_piramide(dados_recortados, fatores=fatores_piramide)
+                    salvar_checkpoint('piramide', hash_piramide, niveis_piramide, arquivos=niveis_piramide.values())
+                return carregar_piramide(niveis=niveis_piramide)
+
+            plot_annual_max_temperature_maps(dados_recortados, south_america_geometry, anos_para_mapa,
+                                             piramide=montar_piramide, fatores_piramide=fatores_piramide,
+                                             **opcoes_figuras)
+
+            # --------------------- # Criação dos Gráficos de Dispersão Anuais # ---------------------
         
-        print("\nCriando os gráficos de dispersão anuais...")
-        plot_annual_scatter(estatisticas_anuais_df['Temperatura Média Anual (°C)'],
-                             estatisticas_anuais_df['Precipitação Média Anual (m)'],
-                             'Dispersão entre Temperatura Média Anual e Precipitação Média Anual',
-                             'Temperatura Média Anual (°C)', 'Precipitação Média Anual (m)',
-                             'figures/dispersao_temp_media_precip_anual_regiao_sul.png')
-
-        plot_annual_scatter(estatisticas_anuais_df['Temperatura Máxima Anual (°C)'],
-                             estatisticas_anuais_df['Precipitação Média Anual (m)'],
-                             'Dispersão entre Temperatura Máxima Anual e Precipitação Média Anual',
-                             'Temperatura Máxima Anual (°C)', 'Precipitação Média Anual (m)',
-                             'figures/dispersao_temp_max_precip_anual_regiao_sul.png', color='red')
+            print("\nCriando os gráficos de dispersão anuais...")
+            gerar_figura(plot_annual_scatter, estatisticas_anuais_df['Temperatura Média Anual (°C)'],
+                         estatisticas_anuais_df['Precipitação Média Anual (m)'],
+                         'Dispersão entre Temperatura Média Anual e Precipitação Média Anual',
+                         'Temperatura Média Anual (°C)', 'Precipitação Média Anual (m)',
+                         'figures/dispersao_temp_media_precip_anual_regiao_sul.png', **opcoes_figuras)
+
+            gerar_figura(plot_annual_scatter, estatisticas_anuais_df['Temperatura Máxima Anual (°C)'],
+                         estatisticas_anuais_df['Precipitação Média Anual (m)'],
+                         'Dispersão entre Temperatura Máxima Anual e Precipitação Média Anual',
+                         'Temperatura Máxima Anual (°C)', 'Precipitação Média Anual (m)',
+                         'figures/dispersao_temp_max_precip_anual_regiao_sul.png', color='red', **opcoes_figuras)
 
 # --------------------- # Análise de Correlação # ---------------------
 
@@ -424,273 +435,141 @@ if __name__ == "__main__":
     else:
         print("Erro: Falha ao realizar o recorte espacial dos dados.")
 
-else:
-    print("Erro: Falha ao combinar os datasets do ERA5.")
+    print("\nProcesso concluído!")
 
-print("\nProcesso concluído!")
+    # ----------------------- ANÁLISE DE TENDÊNCIAS ANUAIS ---------------------
 
-# ----------------------- ANÁLISE DE TENDÊNCIAS ANUAIS ---------------------
+    print("\nAnálise de Tendências Anuais:")
 
-print("\nAnálise de Tendências Anuais:")
+    variaveis_anuais = ['Temperatura Média Anual (°C)', 'Temperatura Máxima Anual (°C)', 'Precipitação Média Anual (m)', 'Precipitação Máxima Anual (m)']
+    anos = estatisticas_anuais_df['Ano'].values
+    nome_pasta_figures = 'figures'
+    os.makedirs(nome_pasta_figures, exist_ok=True)
 
-variaveis_anuais = ['Temperatura Média Anual (°C)', 'Temperatura Máxima Anual (°C)', 'Precipitação Média Anual (m)', 'Precipitação Máxima Anual (m)']
-anos = estatisticas_anuais_df['Ano'].values
-nome_pasta_figures = 'figures'
-os.makedirs(nome_pasta_figures, exist_ok=True)
+    for variavel in variaveis_anuais:
+        valores = estatisticas_anuais_df[variavel].values
+        slope, intercept, r_value, p_value, std_err = linregress(anos, valores)
+        linha_tendencia = slope * anos + intercept
+        r_squared = r_value**2
 
-for variavel in variaveis_anuais:
-    valores = estatisticas_anuais_df[variavel].values
-    slope, intercept, r_value, p_value, std_err = linregress(anos, valores)
-    linha_tendencia = slope * anos + intercept
-    r_squared = r_value**2
-
-    plt.figure(figsize=(10, 6))
-    plt.plot(anos, valores, label=variavel)
-    plt.plot(anos, linha_tendencia, color='red', linestyle='--', label=f'Tendência (slope={slope:.4f})')
-    plt.title(f'Tendência Anual de {variavel}')
-    plt.xlabel('Ano')
-    plt.ylabel(variavel)
-    plt.legend()
-    plt.grid(True)
-    nome_arquivo_tendencia = os.path.join(nome_pasta_figures, f'tendencia_anual_{variavel.lower().replace(" ", "_")}.png')
-    plt.savefig(nome_arquivo_tendencia)
-    plt.close()
+        nome_arquivo_tendencia = os.path.join(nome_pasta_figures, f'tendencia_anual_{variavel.lower().replace(" ", "_")}.png')
+        gerar_figura(plot_annual_trend, anos, valores, linha_tendencia, slope, variavel, nome_arquivo_tendencia, **opcoes_figuras)
 
-    tendencia_significativa = "estatisticamente significativa" if p_value < 0.05 else "não estatisticamente significativa"
-    print(f"\nTendência de {variavel}:")
-    print(f"  Inclinação (slope): {slope:.4f} por ano.")
-    print(f"  P-value: {p_value:.4f} ({tendencia_significativa}).")
-    print(f"  R-squared: {r_squared:.4f} (explica {r_squared*100:.2f}% da variabilidade).")
-    if slope > 0:
-        print("  Indica uma tendência de aumento.")
-    elif slope < 0:
-        print("  Indica uma tendência de diminuição.")
-    else:
-        print("  Não indica uma tendência clara de aumento ou diminuição.")
-
-print("\nGráficos de tendência anual salvos na pasta 'figures'.")
-
-# --------------------------------------------------
-#  DECOMPOSIÇÃO DA SÉRIE TEMPORAL MENSAL
-# --------------------------------------------------
-
-print("\n" + "-"*40)
-print("  DECOMPOSIÇÃO DA SÉRIE TEMPORAL MENSAL")
-print("-" * 40)
-
-from statsmodels.tsa.seasonal import seasonal_decompose
-
-# Criar um índice de tempo (Year-Month)
-estatisticas_mensais_df['Data'] = pd.to_datetime(estatisticas_mensais_df['Ano'].astype(str) + '-' + estatisticas_mensais_df['Mês'].astype(str), format='%Y-%m')
-estatisticas_mensais_df.set_index('Data', inplace=True)
-
-print("\nAnálise da Decomposição da Temperatura Média Mensal:")
-try:
-    decomposicao_temp = seasonal_decompose(estatisticas_mensais_df['Temperatura Média Mensal (°C)'], model='additive', period=12)
-    plt.figure(figsize=(12, 8))
-    plt.subplot(411)
-    plt.plot(estatisticas_mensais_df['Temperatura Média Mensal (°C)'], label='Original')
-    plt.legend(loc='upper left')
-    plt.subplot(412)
-    plt.plot(decomposicao_temp.trend, label='Tendência')
-    plt.legend(loc='upper left')
-    plt.subplot(413)
-    plt.plot(decomposicao_temp.seasonal, label='Sazonalidade')
-    plt.legend(loc='upper left')
-    plt.subplot(414)
-    plt.plot(decomposicao_temp.resid, label='Resíduo')
-    plt.legend(loc='upper left')
-    plt.tight_layout()
-    nome_arquivo_decomposicao_temp = os.path.join(nome_pasta_figures, 'decomposicao_temperatura_mensal.png')
-    plt.savefig(nome_arquivo_decomposicao_temp)
-    plt.close()
-    print(f"  Gráfico de decomposição salvo em '{nome_pasta_figures}'.")
-    print(f"  Tendência (primeiros e últimos valores): {decomposicao_temp.trend.iloc[0]:.2f} -> {decomposicao_temp.trend.iloc[-1]:.2f}")
-    print(f"  Padrão Sazonal (média da sazonalidade): {decomposicao_temp.seasonal.mean():.2f}")
-    print(f"  Resíduo (desvio padrão): {decomposicao_temp.resid.std():.2f} (quanto menor, melhor o ajuste).")
-except Exception as e:
-    print(f"Erro na decomposição da temperatura: {e}")
-
-print("\nAnálise da Decomposição da Precipitação Média Mensal:")
-try:
-    decomposicao_prec = seasonal_decompose(estatisticas_mensais_df['Precipitação Média Mensal (m)'], model='additive', period=12)
-    plt.figure(figsize=(12, 8))
-    plt.subplot(411)
-    plt.plot(estatisticas_mensais_df['Precipitação Média Mensal (m)'], label='Original')
-    plt.legend(loc='upper left')
-    plt.subplot(412)
-    plt.plot(decomposicao_prec.trend, label='Tendência')
-    plt.legend(loc='upper left')
-    plt.subplot(413)
-    plt.plot(decomposicao_prec.seasonal, label='Sazonalidade')
-    plt.legend(loc='upper left')
-    plt.subplot(414)
-    plt.plot(decomposicao_prec.resid, label='Resíduo')
-    plt.legend(loc='upper left')
-    plt.tight_layout()
-    nome_arquivo_decomposicao_prec = os.path.join(nome_pasta_figures, 'decomposicao_precipitacao_mensal.png')
-    plt.savefig(nome_arquivo_decomposicao_prec)
-    plt.close()
-    print(f"  Gráfico de decomposição salvo em '{nome_pasta_figures}'.")
-    print(f"  Tendência (primeiros e últimos valores): {decomposicao_prec.trend.iloc[0]:.2f} -> {decomposicao_prec.trend.iloc[-1]:.2f}")
-    print(f"  Padrão Sazonal (média da sazonalidade): {decomposicao_prec.seasonal.mean():.2f}")
-    print(f"  Resíduo (desvio padrão): {decomposicao_prec.resid.std():.2f} (quanto menor, melhor o ajuste).")
-except Exception as e:
-    print(f"Erro na decomposição da precipitação: {e}")
-
-print("\nModelo de decomposição utilizado: Aditivo (assumindo que a amplitude da sazonalidade não varia com o nível da série).")
-
-
-# --------------------------------------------------
-#  DECOMPOSIÇÃO DA SÉRIE TEMPORAL MENSAL (continuacao eu acho)
-# --------------------------------------------------
-
-print("\n" + "-"*40)
-print("  DECOMPOSIÇÃO DA SÉRIE TEMPORAL MENSAL")
-print("-" * 40)
-
-from statsmodels.tsa.seasonal import seasonal_decompose
-
-# Carregar os dados mensais novamente (garantindo que esteja carregado)
-nome_arquivo_mensal = os.path.join(nome_pasta_outputs, 'estatisticas_mensais.csv')
-try:
-    estatisticas_mensais_df = pd.read_csv(nome_arquivo_mensal)
-except FileNotFoundError:
-    print(f"Erro: Arquivo '{nome_arquivo_mensal}' não encontrado.")
-    exit()
-
-# Criar um índice de tempo (Year-Month)
-estatisticas_mensais_df['Data'] = pd.to_datetime(estatisticas_mensais_df['Ano'].astype(str) + '-' + estatisticas_mensais_df['Mês'].astype(str), format='%Y-%m')
-estatisticas_mensais_df.set_index('Data', inplace=True)
-
-# Decomposição da Temperatura Média Mensal
-try:
-    decomposicao_temp = seasonal_decompose(estatisticas_mensais_df['Temperatura Média Mensal (°C)'], model='additive', period=12)
-    plt.figure(figsize=(12, 8))
-    plt.subplot(411)
-    plt.plot(estatisticas_mensais_df['Temperatura Média Mensal (°C)'], label='Original')
-    plt.legend(loc='upper left')
-    plt.subplot(412)
-    plt.plot(decomposicao_temp.trend, label='Tendência')
-    plt.legend(loc='upper left')
-    plt.subplot(413)
-    plt.plot(decomposicao_temp.seasonal, label='Sazonalidade')
-    plt.legend(loc='upper left')
-    plt.subplot(414)
-    plt.plot(decomposicao_temp.resid, label='Resíduo')
-    plt.legend(loc='upper left')
-    plt.tight_layout()
-    nome_arquivo_decomposicao_temp = os.path.join(nome_pasta_figures, 'decomposicao_temperatura_mensal.png')
-    plt.savefig(nome_arquivo_decomposicao_temp)
-    plt.close()
-    print(f"\nGráfico de decomposição da temperatura mensal salvo em '{nome_pasta_figures}'.")
-except Exception as e:
-    print(f"Erro na decomposição da temperatura: {e}")
-
-# Decomposição da Precipitação Média Mensal
-try:
-    decomposicao_prec = seasonal_decompose(estatisticas_mensais_df['Precipitação Média Mensal (m)'], model='additive', period=12)
-    plt.figure(figsize=(12, 8))
-    plt.subplot(411)
-    plt.plot(estatisticas_mensais_df['Precipitação Média Mensal (m)'], label='Original')
-    plt.legend(loc='upper left')
-    plt.subplot(412)
-    plt.plot(decomposicao_prec.trend, label='Tendência')
-    plt.legend(loc='upper left')
-    plt.subplot(413)
-    plt.plot(decomposicao_prec.seasonal, label='Sazonalidade')
-    plt.legend(loc='upper left')
-    plt.subplot(414)
-    plt.plot(decomposicao_prec.resid, label='Resíduo')
-    plt.legend(loc='upper left')
-    plt.tight_layout()
-    nome_arquivo_decomposicao_prec = os.path.join(nome_pasta_figures, 'decomposicao_precipitacao_mensal.png')
-    plt.savefig(nome_arquivo_decomposicao_prec)
-    plt.close()
-    print(f"Gráfico de decomposição da precipitação mensal salvo em '{nome_pasta_figures}'.")
-except Exception as e:
-    print(f"Erro na decomposição da precipitação: {e}")
-    
-    
-# -------------------------------------- # Criação das Séries Temporais Anuais # --------------------------------------
-
-print("\nCriando as séries temporais anuais...")
-
-# Carregar os dados anuais novamente
-nome_arquivo_anual = os.path.join(nome_pasta_outputs, 'estatisticas_anuais.csv')
-try:
-    estatisticas_anuais_df = pd.read_csv(nome_arquivo_anual)
-except FileNotFoundError:
-    print(f"Erro: Arquivo '{nome_arquivo_anual}' não encontrado.")
-    exit()
-
-variaveis_anuais_serie_temporal = ['Temperatura Média Anual (°C)', 'Temperatura Máxima Anual (°C)', 'Precipitação Média Anual (m)', 'Precipitação Máxima Anual (m)']
-anos = estatisticas_anuais_df['Ano'].values
-
-for variavel in variaveis_anuais_serie_temporal:
-    plt.figure(figsize=(12, 6))
-    plt.plot(anos, estatisticas_anuais_df[variavel], marker='o', linestyle='-')
-    plt.title(f'Série Temporal Anual da {variavel} na Região Sul')
-    plt.xlabel('Ano')
-    plt.ylabel(variavel)
-    plt.grid(True)
-    nome_arquivo_serie_temporal = os.path.join(nome_pasta_figures, f'serie_temporal_anual_{variavel.lower().replace(" ", "_").replace("(", "").replace(")", "").replace("°c", "").replace("m", "")}.png')
-    plt.savefig(nome_arquivo_serie_temporal)
-    plt.close()
-    print(f"Série temporal anual da {variavel} salva em '{nome_pasta_figures}'.")
-
-print("\nSéries temporais anuais salvas na pasta 'figures'.")
-
-# --------------------------------------------------
-#  ANÁLISE DE SAZONALIDADE (Média Mensal)
-# --------------------------------------------------
-
-print("\n" + "-"*40)
-print("  ANÁLISE DE SAZONALIDADE (Média Mensal)")
-print("-" * 40)
-
-# Calcular a média mensal para temperatura
-temperatura_media_mensal_sazonalidade = estatisticas_mensais_df.groupby('Mês')['Temperatura Média Mensal (°C)'].mean()
-
-# Calcular a média mensal para precipitação
-precipitacao_media_mensal_sazonalidade = estatisticas_mensais_df.groupby('Mês')['Precipitação Média Mensal (m)'].mean()
-
-# Visualizar a sazonalidade da temperatura
-plt.figure(figsize=(10, 6))
-temperatura_media_mensal_sazonalidade.plot(kind='bar')
-plt.title('Média Mensal da Temperatura na Região Sul (1940-2025)')
-plt.xlabel('Mês')
-plt.ylabel('Temperatura Média (°C)')
-plt.xticks(rotation=0)
-plt.grid(axis='y')
-nome_arquivo_sazonalidade_temp = os.path.join(nome_pasta_figures, 'sazonalidade_temperatura_mensal.png')
-plt.savefig(nome_arquivo_sazonalidade_temp)
-plt.close()
-print(f"\nGráfico de sazonalidade da temperatura mensal salvo em '{nome_pasta_figures}'.")
-
-print("\nPadrão Sazonal da Temperatura Média Mensal:")
-meses_nomes = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
-temp_max_mes = temperatura_media_mensal_sazonalidade.idxmax()
-temp_min_mes = temperatura_media_mensal_sazonalidade.idxmin()
-print(f"  Meses mais quentes (média): {meses_nomes[temp_max_mes - 1]}")
-print(f"  Meses mais frios (média): {meses_nomes[temp_min_mes - 1]}")
-
-# Visualizar a sazonalidade da precipitação
-plt.figure(figsize=(10, 6))
-precipitacao_media_mensal_sazonalidade.plot(kind='bar')
-plt.title('Média Mensal da Precipitação na Região Sul (1940-2025)')
-plt.xlabel('Mês')
-plt.ylabel('Precipitação Média (m)')
-plt.xticks(rotation=0)
-plt.grid(axis='y')
-nome_arquivo_sazonalidade_prec = os.path.join(nome_pasta_figures, 'sazonalidade_precipitacao_mensal.png')
-plt.savefig(nome_arquivo_sazonalidade_prec)
-plt.close()
-print(f"Gráfico de sazonalidade da precipitação mensal salvo em '{nome_pasta_figures}'.")
-
-print("\nPadrão Sazonal da Precipitação Média Mensal:")
-precip_max_mes = precipitacao_media_mensal_sazonalidade.idxmax()
-precip_min_mes = precipitacao_media_mensal_sazonalidade.idxmin()
-print(f"  Meses com maior precipitação (média): {meses_nomes[precip_max_mes - 1]}")
-print(f"  Meses com menor precipitação (média): {meses_nomes[precip_min_mes - 1]}")
-    
\ No newline at end of file
+        tendencia_significativa = "estatisticamente significativa" if p_value < 0.05 else "não estatisticamente significativa"
+        print(f"\nTendência de {variavel}:")
+        print(f"  Inclinação (slope): {slope:.4f} por ano.")
+        print(f"  P-value: {p_value:.4f} ({tendencia_significativa}).")
+        print(f"  R-squared: {r_squared:.4f} (explica {r_squared*100:.2f}% da variabilidade).")
+        if slope > 0:
+            print("  Indica uma tendência de aumento.")
+        elif slope < 0:
+            print("  Indica uma tendência de diminuição.")
+        else:
+            print("  Não indica uma tendência clara de aumento ou diminuição.")
+
+    if not SEM_FIGURAS:
+        print("\nGráficos de tendência anual salvos na pasta 'figures'.")
+
+    # --------------------------------------------------
+    #  DECOMPOSIÇÃO DA SÉRIE TEMPORAL MENSAL
+    # --------------------------------------------------
+
+    print("\n" + "-"*40)
+    print("  DECOMPOSIÇÃO DA SÉRIE TEMPORAL MENSAL")
+    print("-" * 40)
+
+    # Criar um índice de tempo (Year-Month)
+    estatisticas_mensais_df['Data'] = pd.to_datetime(estatisticas_mensais_df['Ano'].astype(str) + '-' + estatisticas_mensais_df['Mês'].astype(str), format='%Y-%m')
+    estatisticas_mensais_df.set_index('Data', inplace=True)
+
+    # Decompõe temperatura e precipitação mensais em uma única chamada
+    colunas_mensais = {'Temperatura Média Mensal (°C)': ('temperatura', 'decomposicao_temperatura_mensal.png'),
+                       'Precipitação Média Mensal (m)': ('precipitação', 'decomposicao_precipitacao_mensal.png')}
+    decomposicao_mensal = decompor_lote(estatisticas_mensais_df[list(colunas_mensais)], periodo=12, modelo='additive')
+
+    for coluna, (nome_variavel, nome_figura) in colunas_mensais.items():
+        print(f"\nAnálise da Decomposição da {nome_variavel.capitalize()} Média Mensal:")
+        tendencia = decomposicao_mensal.trend[coluna]
+        sazonalidade = decomposicao_mensal.seasonal[coluna]
+        residuo = decomposicao_mensal.resid[coluna]
+
+        nome_arquivo_decomposicao = os.path.join(nome_pasta_figures, nome_figura)
+        gerar_figura(plot_seasonal_decomposition, decomposicao_mensal.observed[coluna], tendencia,
+                     sazonalidade, residuo, nome_arquivo_decomposicao, **opcoes_figuras)
+        if not SEM_FIGURAS:
+            print(f"  Gráfico de decomposição salvo em '{nome_pasta_figures}'.")
+        print(f"  Tendência (primeiros e últimos valores): {tendencia.iloc[0]:.2f} -> {tendencia.iloc[-1]:.2f}")
+        print(f"  Padrão Sazonal (média da sazonalidade): {sazonalidade.mean():.2f}")
+        print(f"  Resíduo (desvio padrão): {residuo.std():.2f} (quanto menor, melhor o ajuste).")
+
+    print("\nModelo de decomposição utilizado: Aditivo (assumindo que a amplitude da sazonalidade não varia com o nível da série).")
+
+
+    # -------------------------------------- # Criação das Séries Temporais Anuais # --------------------------------------
+
+    if not SEM_FIGURAS:
+        print("\nCriando as séries temporais anuais...")
+
+    # Carregar os dados anuais novamente
+    nome_arquivo_anual = os.path.join(nome_pasta_outputs, 'estatisticas_anuais.csv')
+    try:
+        estatisticas_anuais_df = pd.read_csv(nome_arquivo_anual)
+    except FileNotFoundError:
+        print(f"Erro: Arquivo '{nome_arquivo_anual}' não encontrado.")
+        exit()
+
+    variaveis_anuais_serie_temporal = ['Temperatura Média Anual (°C)', 'Temperatura Máxima Anual (°C)', 'Precipitação Média Anual (m)', 'Precipitação Máxima Anual (m)']
+    anos = estatisticas_anuais_df['Ano'].values
+
+    for variavel in variaveis_anuais_serie_temporal:
+        nome_arquivo_serie_temporal = os.path.join(nome_pasta_figures, f'serie_temporal_anual_{variavel.lower().replace(" ", "_").replace("(", "").replace(")", "").replace("°c", "").replace("m", "")}.png')
+        gerar_figura(plot_annual_time_series, anos, estatisticas_anuais_df[variavel],
+                     f'Série Temporal Anual da {variavel} na Região Sul', variavel, nome_arquivo_serie_temporal, **opcoes_figuras)
+        if not SEM_FIGURAS:
+            print(f"Série temporal anual da {variavel} salva em '{nome_pasta_figures}'.")
+
+    if not SEM_FIGURAS:
+        print("\nSéries temporais anuais salvas na pasta 'figures'.")
+
+    # --------------------------------------------------
+    #  ANÁLISE DE SAZONALIDADE (Média Mensal)
+    # --------------------------------------------------
+
+    print("\n" + "-"*40)
+    print("  ANÁLISE DE SAZONALIDADE (Média Mensal)")
+    print("-" * 40)
+
+    # Calcular a média mensal para temperatura
+    temperatura_media_mensal_sazonalidade = estatisticas_mensais_df.groupby('Mês')['Temperatura Média Mensal (°C)'].mean()
+
+    # Calcular a média mensal para precipitação
+    precipitacao_media_mensal_sazonalidade = estatisticas_mensais_df.groupby('Mês')['Precipitação Média Mensal (m)'].mean()
+
+    # Visualizar a sazonalidade da temperatura
+    nome_arquivo_sazonalidade_temp = os.path.join(nome_pasta_figures, 'sazonalidade_temperatura_mensal.png')
+    gerar_figura(plot_monthly_seasonality, temperatura_media_mensal_sazonalidade,
+                 'Média Mensal da Temperatura na Região Sul (1940-2025)', 'Temperatura Média (°C)',
+                 nome_arquivo_sazonalidade_temp, **opcoes_figuras)
+    if not SEM_FIGURAS:
+        print(f"\nGráfico de sazonalidade da temperatura mensal salvo em '{nome_pasta_figures}'.")
+
+    print("\nPadrão Sazonal da Temperatura Média Mensal:")
+    meses_nomes = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
+    temp_max_mes = temperatura_media_mensal_sazonalidade.idxmax()
+    temp_min_mes = temperatura_media_mensal_sazonalidade.idxmin()
+    print(f"  Meses mais quentes (média): {meses_nomes[temp_max_mes - 1]}")
+    print(f"  Meses mais frios (média): {meses_nomes[temp_min_mes - 1]}")
+
+    # Visualizar a sazonalidade da precipitação
+    nome_arquivo_sazonalidade_prec = os.path.join(nome_pasta_figures, 'sazonalidade_precipitacao_mensal.png')
+    gerar_figura(plot_monthly_seasonality, precipitacao_media_mensal_sazonalidade,
+                 'Média Mensal da Precipitação na Região Sul (1940-2025)', 'Precipitação Média (m)',
+                 nome_arquivo_sazonalidade_prec, **opcoes_figuras)
+    if not SEM_FIGURAS:
+        print(f"Gráfico de sazonalidade da precipitação mensal salvo em '{nome_pasta_figures}'.")
+
+    print("\nPadrão Sazonal da Precipitação Média Mensal:")
+    precip_max_mes = precipitacao_media_mensal_sazonalidade.idxmax()
+    precip_min_mes = precipitacao_media_mensal_sazonalidade.idxmin()
+    print(f"  Meses com maior precipitação (média): {meses_nomes[precip_max_mes - 1]}")
+    print(f"  Meses com menor precipitação (média): {meses_nomes[precip_min_mes - 1]}")
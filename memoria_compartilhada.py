@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo para compartilhar o cubo recortado entre processos sem cópia.
+
+As variáveis e as coordenadas do dataset são copiadas uma única vez para
+blocos de multiprocessing.shared_memory, lendo a origem (em memória,
+preguiçosa ou dask) em fatias ao longo da primeira dimensão, de modo que o
+cubo nunca existe duas vezes inteiro na memória. Os processos recebem apenas
+um descritor pequeno (nomes dos blocos, formas e tipos) e montam um
+xr.Dataset cujos arrays são vistas diretas da memória compartilhada, sem
+pickle dos dados nem releitura dos arquivos.
+
+@author: Gustavo Starling
+
+"""
+
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+import numpy as np
+import xarray as xr
+
+# Tamanho aproximado (bytes) de cada fatia lida da origem ao preencher um bloco
+TAMANHO_FATIA_COPIA = 64 * 1024 ** 2
+
+# Blocos abertos neste processo; mantê-los referenciados evita que a memória seja fechada
+_blocos_anexados = {}
+
+# Cria um bloco com o conteúdo de uma variável, copiando-a fatia por fatia
+def _compartilhar_variavel(variavel, blocos):
+    if variavel.dtype.hasobject or variavel.ndim == 0:
+        # Valores escalares ou de objeto (ex.: textos) são pequenos e vão no próprio descritor
+        return {'valores': np.asarray(variavel.values), 'dims': variavel.dims, 'attrs': dict(variavel.attrs)}
+
+    bloco = shared_memory.SharedMemory(create=True, size=max(variavel.nbytes, 1))
+    blocos.append(bloco)
+    destino = np.ndarray(variavel.shape, dtype=variavel.dtype, buffer=bloco.buf)
+
+    bytes_por_linha = max(variavel.nbytes // max(variavel.shape[0], 1), 1)
+    passo = max(1, TAMANHO_FATIA_COPIA // bytes_por_linha)
+    for inicio in range(0, variavel.shape[0], passo):
+        destino[inicio:inicio + passo] = np.asarray(variavel[inicio:inicio + passo].values)
+
+    return {
+        'bloco': bloco.name,
+        'shape': variavel.shape,
+        'dtype': variavel.dtype.str,
+        'dims': variavel.dims,
+        'attrs': dict(variavel.attrs),
+    }
+
+# Copia as variáveis e coordenadas do dataset para a memória compartilhada
+def compartilhar_cubo(dados):
+    """
+    Coloca as variáveis de dados e as coordenadas em memória compartilhada.
+
+    Args:
+        dados (xr.Dataset): Cubo recortado (ex.: saída de spatial_subset), carregado ou preguiçoso.
+
+    Returns:
+        tuple: (descritor, blocos). O descritor é enviado aos processos; os blocos
+        ficam com o processo principal e devem ser liberados com liberar_cubo.
+    """
+    descritor = {'variaveis': {}, 'coords': {}, 'attrs': dict(dados.attrs)}
+    blocos = []
+    try:
+        for nome, variavel in dados.data_vars.items():
+            descritor['variaveis'][nome] = _compartilhar_variavel(variavel.variable, blocos)
+        for nome, coordenada in dados.coords.items():
+            descritor['coords'][nome] = _compartilhar_variavel(coordenada.variable, blocos)
+    except BaseException:
+        liberar_cubo(blocos)
+        raise
+    return descritor, blocos
+
+# Monta a visão (somente leitura) de uma entrada do descritor, recortada nas fatias pedidas
+def _anexar_variavel(info, fatias):
+    if 'valores' in info:
+        valores = info['valores']
+    else:
+        bloco = _blocos_anexados.get(info['bloco'])
+        if bloco is None:
+            bloco = shared_memory.SharedMemory(name=info['bloco'])
+            _blocos_anexados[info['bloco']] = bloco
+        valores = np.ndarray(info['shape'], dtype=np.dtype(info['dtype']), buffer=bloco.buf)
+        valores.flags.writeable = False  # visão somente leitura: os processos não alteram o cubo
+    indice = tuple(fatias.get(dim, slice(None)) for dim in info['dims'])
+    return xr.Variable(info['dims'], valores[indice] if indice else valores, attrs=info['attrs'])
+
+# Monta, a partir do descritor, um dataset cujos arrays apontam para a memória compartilhada
+def anexar_cubo(descritor, **fatias):
+    """
+    Reconstrói o dataset a partir do descritor, sem copiar os dados.
+
+    Args:
+        descritor (dict): Saída de compartilhar_cubo.
+        **fatias: Fatias posicionais por dimensão (ex.: valid_time=slice(0, 12)). Só a parte
+            pedida das coordenadas vira índice, o que evita reconstruir o eixo inteiro do tempo.
+
+    Returns:
+        xr.Dataset: Dataset cujas variáveis são vistas da memória compartilhada.
+    """
+    variaveis = {nome: _anexar_variavel(info, fatias) for nome, info in descritor['variaveis'].items()}
+    coords = {nome: _anexar_variavel(info, fatias) for nome, info in descritor['coords'].items()}
+    return xr.Dataset(variaveis, coords=coords, attrs=descritor['attrs'])
+
+# Fecha e remove os blocos de memória compartilhada criados por compartilhar_cubo
+def liberar_cubo(blocos):
+    for bloco in blocos:
+        bloco.close()
+        bloco.unlink()
+
+# Compartilha o cubo durante um bloco 'with' e libera a memória ao final
+@contextmanager
+def cubo_compartilhado(dados):
+    descritor, blocos = compartilhar_cubo(dados)
+    try:
+        yield descritor
+    finally:
+        liberar_cubo(blocos)
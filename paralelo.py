@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo para execução paralela das etapas de estatística (map-reduce por ano).
+
+O eixo do tempo é dividido em fatias de um ano. Cada fatia é reduzida em um
+processo separado (médias mensais, média e máxima anuais por célula) e os
+resultados parciais são combinados em ordem cronológica, o que torna a saída
+idêntica à do caminho serial de main11.py. O cubo fica em memória
+compartilhada; cada processo recebe só o descritor e anexa apenas o intervalo
+do seu ano.
+Cada ano concluído vira um checkpoint, e com retomar=True os anos já
+concluídos não são recalculados.
+
+@author: Gustavo Starling
+
+"""
+
+import os
+import numpy as np
+import xarray as xr
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from memoria_compartilhada import cubo_compartilhado, anexar_cubo
+from utilitarios import calcular_hash
+from checkpoints import DIR_CHECKPOINTS, checkpoint_valido, carregar_checkpoint, salvar_checkpoint
+
+# Reduz uma fatia anual: médias mensais, média e máxima anuais por célula
+def _reduzir_fatia(fatia, periodo_anual):
+    mensal = fatia.resample(valid_time='1M').mean()
+
+    if periodo_anual is not None:
+        fatia = fatia.sel(valid_time=slice(*periodo_anual))
+    if fatia.sizes['valid_time'] == 0:
+        return mensal, None, None
+
+    anual = fatia.groupby(fatia['valid_time'].dt.year)
+    return mensal, anual.mean(dim='valid_time'), anual.max(dim='valid_time')
+
+# Reduz uma fatia anual lida diretamente do cubo em memória compartilhada
+def _reduzir_fatia_compartilhada(descritor, inicio, fim, periodo_anual):
+    fatia = anexar_cubo(descritor, valid_time=slice(inicio, fim))
+    return _reduzir_fatia(fatia, periodo_anual)
+
+# Divide o eixo do tempo (ordenado) em intervalos [inicio, fim) de um ano cada
+def dividir_por_ano(dados):
+    anos = dados['valid_time'].dt.year.values
+    _, inicios = np.unique(anos, return_index=True)
+    fins = np.append(inicios[1:], anos.size)
+    return list(zip(inicios.tolist(), fins.tolist()))
+
+# Combina os resultados parciais das fatias, sempre em ordem cronológica
+def _combinar(parciais, dim):
+    parciais = [parcial for parcial in parciais if parcial is not None]
+    return xr.concat(parciais, dim=dim) if parciais else None
+
+# Calcula as agregações mensais e anuais em paralelo, uma fatia anual por processo
+def agregar_por_ano(dados, periodo_anual=None, n_processos=None, retomar=False, chave_entrada=None,
+                    checkpoint_dir=DIR_CHECKPOINTS):
+    """
+    Executa em paralelo o resample mensal e o groupby anual (média e máxima) do cubo.
+
+    Args:
+        dados (xr.Dataset): Dataset recortado com dimensão 'valid_time'.
+        periodo_anual (tuple, opcional): (data_inicio, data_fim) aplicado apenas às
+            agregações anuais, como o recorte temporal de main11.py.
+        n_processos (int, opcional): Número de processos. Padrão é o número de núcleos.
+            Com 1, as fatias são reduzidas no próprio processo.
+        retomar (bool, opcional): Reaproveita os anos com checkpoint válido (--resume). Padrão é False.
+        chave_entrada (str, opcional): Identificação das entradas (ex.: hash de
+            checkpoints.identificar_fontes e do recorte). Sem ela, nenhum checkpoint é usado.
+        checkpoint_dir (str, opcional): Diretório dos checkpoints. Padrão é 'outputs/checkpoints'.
+
+    Returns:
+        tuple: (dados_mensais, dados_anuais, dados_anuais_max), iguais aos do caminho serial.
+    """
+    # Sem .load(): o cubo é lido da origem direto para a memória compartilhada (ou por fatia)
+    dados = dados.sortby('valid_time')
+    fatias = dividir_por_ano(dados)
+    anos = dados['valid_time'].dt.year.values[[inicio for inicio, _ in fatias]]
+
+    # Cada ano é identificado pelas entradas, pelos limites da sua fatia e pelo período anual,
+    # sem ler os valores do cubo
+    usar_checkpoints = chave_entrada is not None
+    nomes = [f'agregacao_{ano}' for ano in anos]
+    tempos = dados['valid_time'].values
+    hashes = [calcular_hash(chave_entrada, tempos[inicio], tempos[fim - 1], periodo_anual=periodo_anual)
+              if usar_checkpoints else None for inicio, fim in fatias]
+
+    resultados = [None] * len(fatias)
+    pendentes = []
+    for k, (nome, hash_fatia) in enumerate(zip(nomes, hashes)):
+        if retomar and usar_checkpoints and checkpoint_valido(nome, hash_fatia, checkpoint_dir):
+            resultados[k] = carregar_checkpoint(nome, checkpoint_dir)
+        else:
+            pendentes.append(k)
+    if retomar and usar_checkpoints:
+        print(f"Retomando: {len(fatias) - len(pendentes)} anos com checkpoint válido, {len(pendentes)} a calcular.")
+
+    n_processos = max(1, min(n_processos or os.cpu_count() or 1, len(pendentes)))
+    if pendentes and n_processos == 1:
+        for k in pendentes:
+            inicio, fim = fatias[k]
+            resultados[k] = _reduzir_fatia(dados.isel(valid_time=slice(inicio, fim)), periodo_anual)
+            if usar_checkpoints:
+                salvar_checkpoint(nomes[k], hashes[k], resultados[k], output_dir=checkpoint_dir)
+    elif pendentes:
+        # Os processos leem suas fatias da memória compartilhada; cada ano é salvo assim que termina
+        with cubo_compartilhado(dados) as descritor:
+            with ProcessPoolExecutor(max_workers=n_processos) as executor:
+                futuros = {executor.submit(_reduzir_fatia_compartilhada, descritor, *fatias[k], periodo_anual): k
+                           for k in pendentes}
+                for futuro in as_completed(futuros):
+                    k = futuros[futuro]
+                    resultados[k] = futuro.result()
+                    if usar_checkpoints:
+                        salvar_checkpoint(nomes[k], hashes[k], resultados[k], output_dir=checkpoint_dir)
+
+    mensais, anuais, maximas = zip(*resultados)
+
+    # Meses ausentes entre fatias voltam como NaN, como no resample do caminho serial
+    dados_mensais = _combinar(mensais, 'valid_time').resample(valid_time='1M').mean()
+    print(f"Agregação por ano concluída: {len(fatias)} anos ({len(pendentes)} calculados em {n_processos} processos).")
+    return dados_mensais, _combinar(anuais, 'year'), _combinar(maximas, 'year')
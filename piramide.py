@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo para construção de pirâmides multi-resolução dos campos derivados do ERA5.
+
+Cada nível da pirâmide é uma versão reamostrada (2x, 4x, 8x...) dos campos
+anuais em grade, usada para gerar pré-visualizações e miniaturas de mapas
+sem renderizar a grade em resolução completa.
+
+@author: Gustavo Starling
+
+"""
+
+import os
+import numpy as np
+import xarray as xr
+
+# Agregação espacial usada em cada variável ao reduzir a resolução. O acumulado anual
+# de 'tp' é uma lâmina (m) por célula, então na agregação espacial entra a média
+AGREGACOES = {
+    't2m': 'mean',
+    'tp': 'mean',
+    't2m_max': 'max',
+    'tp_max': 'max',
+}
+
+# Calcula os campos anuais em grade que alimentam os mapas
+def calcular_campos_derivados(dados_era5):
+    """
+    Calcula os campos anuais derivados (média, acumulado e máximas) por célula da grade.
+
+    Args:
+        dados_era5 (xr.Dataset): Dataset recortado com 't2m', 'tp' e 'valid_time'.
+
+    Returns:
+        xr.Dataset: Campos com dimensão 'year': 't2m' (média), 'tp' (soma),
+        't2m_max' e 'tp_max' (máximas anuais).
+    """
+    anual = dados_era5.groupby(dados_era5['valid_time'].dt.year)
+    return xr.Dataset({
+        't2m': anual.mean(dim='valid_time')['t2m'],
+        'tp': anual.sum(dim='valid_time')['tp'],
+        't2m_max': anual.max(dim='valid_time')['t2m'],
+        'tp_max': anual.max(dim='valid_time')['tp'],
+    })
+
+# Reduz a resolução de um dataset aplicando a agregação correta por variável
+def reduzir_resolucao(campos, fator):
+    """
+    Agrega blocos de fator x fator células, usando a agregação definida em AGREGACOES.
+
+    Args:
+        campos (xr.Dataset): Campos derivados em resolução completa.
+        fator (int): Fator de redução aplicado em latitude e longitude.
+
+    Returns:
+        xr.Dataset: Campos na resolução reduzida. Blocos incompletos nas bordas são
+        completados com NaN e agregados apenas com as células existentes.
+    """
+    reduzidos = {}
+    for nome, variavel in campos.data_vars.items():
+        blocos = variavel.coarsen(latitude=fator, longitude=fator, boundary='pad')
+        reduzidos[nome] = getattr(blocos, AGREGACOES.get(nome, 'mean'))(skipna=True)
+    return xr.Dataset(reduzidos, attrs={'fator_reducao': fator})
+
+# Constrói e salva a pirâmide de resoluções em disco
+def construir_piramide(dados_era5, fatores=(2, 4, 8), output_dir='outputs/piramide'):
+    """
+    Gera os níveis da pirâmide e salva cada um em 'nivel_<fator>.nc'.
+
+    Args:
+        dados_era5 (xr.Dataset): Dataset recortado com 't2m', 'tp' e 'valid_time'.
+        fatores (tuple, opcional): Fatores de redução. O nível 1 (resolução completa) é sempre incluído.
+        output_dir (str, opcional): Diretório de saída. Padrão é 'outputs/piramide'.
+
+    Returns:
+        dict: Caminho do arquivo de cada nível, indexado pelo fator.
+    """
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    campos = calcular_campos_derivados(dados_era5)
+    niveis = {}
+    for fator in sorted(set((1,) + tuple(fatores))):
+        nivel = campos if fator == 1 else reduzir_resolucao(campos, fator)
+        if nivel.sizes['latitude'] == 0 or nivel.sizes['longitude'] == 0:
+            print(f"Aviso: Grade pequena demais para o fator {fator}, nível ignorado.")
+            continue
+        caminho = os.path.join(output_dir, f'nivel_{fator}.nc')
+        nivel.to_netcdf(caminho)
+        niveis[fator] = caminho
+
+    # Remove níveis de execuções anteriores com outros fatores, para não serem abertos por engano
+    for nome in os.listdir(output_dir):
+        if nome.startswith('nivel_') and nome.endswith('.nc') and os.path.join(output_dir, nome) not in niveis.values():
+            os.remove(os.path.join(output_dir, nome))
+
+    print(f"\nPirâmide de resoluções salva em: {output_dir} (níveis: {sorted(niveis)})")
+    return niveis
+
+# Abre os níveis de uma pirâmide previamente salva
+def carregar_piramide(output_dir='outputs/piramide', niveis=None):
+    """
+    Abre os níveis da pirâmide. Quem chama deve fechar os datasets ao terminar.
+
+    Args:
+        output_dir (str, opcional): Diretório da pirâmide. Padrão é 'outputs/piramide'.
+        niveis (dict, opcional): Caminho de cada nível indexado pelo fator (saída de
+            construir_piramide). Quando informado, só esses arquivos são abertos.
+
+    Returns:
+        dict: Níveis abertos (fator -> xr.Dataset).
+    """
+    if niveis is not None:
+        return {int(fator): xr.open_dataset(caminho) for fator, caminho in niveis.items()}
+
+    niveis = {}
+    if not os.path.exists(output_dir):
+        print(f"Erro: Diretório da pirâmide não encontrado: {output_dir}")
+        return niveis
+
+    for nome in os.listdir(output_dir):
+        if nome.startswith('nivel_') and nome.endswith('.nc'):
+            fator = int(nome[len('nivel_'):-len('.nc')])
+            niveis[fator] = xr.open_dataset(os.path.join(output_dir, nome))
+    return niveis
+
+# Escolhe o nível mais grosseiro que ainda atende à resolução de saída
+def escolher_nivel(piramide, extensao_graus, largura_pixels):
+    """
+    Seleciona o nível cuja célula não é maior que o tamanho de um pixel da figura.
+
+    Args:
+        piramide (dict): Níveis da pirâmide (fator -> xr.Dataset).
+        extensao_graus (float): Largura do mapa em graus de longitude.
+        largura_pixels (float): Largura da figura em pixels (polegadas x DPI).
+
+    Returns:
+        xr.Dataset: Nível escolhido (o nível mais fino se nenhum atender).
+    """
+    graus_por_pixel = extensao_graus / largura_pixels
+    escolhido = min(piramide)
+    for fator in sorted(piramide):
+        longitudes = piramide[fator]['longitude'].values
+        if longitudes.size < 2:
+            continue
+        resolucao = np.abs(np.diff(longitudes)).mean()
+        if resolucao <= graus_por_pixel:
+            escolhido = fator
+    return piramide[escolhido]
@@ -8,24 +8,98 @@ Módulo para processamento dos dados climáticos ERA5.
 
 """
 
+import numpy as np
 import xarray as xr
 import os
 import geopandas as gpd
 
-# Carrega os datasets de temperatura e precipitação do ERA5
-def load_era5_data(data_dir='data'):
-    temp_file = os.path.join(data_dir, 'data_0.nc')
-    precip_file = os.path.join(data_dir, 'data_1.nc')
+EXTENSOES_NETCDF = ('.nc', '.nc4')
+EXTENSOES_GRIB = ('.grib', '.grib2', '.grb', '.grb2')
+
+# Nomes usados pelo cfgrib/ecCodes para as variáveis que o pipeline espera
+NOMES_GRIB = {'2t': 't2m', 'var167': 't2m', 'var228': 'tp'}
+
+# Subdiretório (ao lado do GRIB) onde ficam os índices persistentes das mensagens
+DIR_INDICES_GRIB = '.indices_grib'
+
+# Procura o arquivo de dados com qualquer extensão suportada (NetCDF tem prioridade)
+def _localizar_arquivo(data_dir, nome_base):
+    for extensao in EXTENSOES_NETCDF + EXTENSOES_GRIB:
+        caminho = os.path.join(data_dir, nome_base + extensao)
+        if os.path.exists(caminho):
+            return caminho
+    return os.path.join(data_dir, nome_base + EXTENSOES_NETCDF[0])
+
+# Converte a estrutura do cfgrib (time/step) para o esquema 't2m'/'tp'/'valid_time'
+def _normalizar_grib(dados):
+    dados = dados.rename({nome: destino for nome, destino in NOMES_GRIB.items() if nome in dados})
+
+    if 'step' in dados.dims:
+        # Campos acumulados (tp) vêm em (time, step): achata em uma única dimensão de tempo válido
+        dados = dados.stack(passo=('time', 'step')).reset_index('passo')
+        dados = dados.drop_vars(['time', 'step'], errors='ignore').swap_dims({'passo': 'valid_time'})
+
+        # Só a coordenada é consultada (os valores continuam preguiçosos): descarta slots sem
+        # tempo válido e, quando passos de previsões diferentes caem no mesmo instante, mantém
+        # a previsão mais recente (menor passo), que é a que existe no arquivo
+        tempos = dados['valid_time'].values
+        _, ultimos = np.unique(tempos[::-1], return_index=True)
+        manter = tempos.size - 1 - ultimos
+        manter = manter[~np.isnat(tempos[manter])]
+        dados = dados.isel(valid_time=manter).transpose('valid_time', ...)
+    elif 'time' in dados.dims:
+        if 'valid_time' in dados.coords:
+            dados = dados.swap_dims({'time': 'valid_time'}).drop_vars('time')
+        else:
+            dados = dados.rename({'time': 'valid_time'})
+
+    return dados.drop_vars(['step', 'surface', 'number'], errors='ignore')
+
+# Abre um arquivo NetCDF ou GRIB de forma preguiçosa (lazy)
+def open_era5_file(caminho, chunks=None):
+    """
+    Abre um arquivo do ERA5 no esquema 't2m'/'tp'/'valid_time'.
+
+    Args:
+        caminho (str): Arquivo NetCDF ou GRIB.
+        chunks (dict ou str, opcional): Blocos do dask. Por padrão o GRIB é lido em
+            blocos automáticos (se o dask estiver instalado) e o NetCDF sem dask.
+
+    Returns:
+        xr.Dataset: Dataset aberto sem carregar os valores na memória.
+    """
+    if caminho.lower().endswith(EXTENSOES_GRIB):
+        if chunks is None:
+            try:
+                import dask  # noqa: F401
+                chunks = 'auto'
+            except ImportError:
+                chunks = None
+        dir_indices = os.path.join(os.path.dirname(caminho), DIR_INDICES_GRIB)
+        if not os.path.exists(dir_indices):
+            os.makedirs(dir_indices)
+        # O índice das mensagens fica salvo em disco e só é refeito quando o GRIB muda
+        indexpath = os.path.join(dir_indices, os.path.basename(caminho) + '.{short_hash}.idx')
+        dados = xr.open_dataset(caminho, engine='cfgrib', chunks=chunks,
+                                backend_kwargs={'indexpath': indexpath})
+        return _normalizar_grib(dados)
+
+    return xr.open_dataset(caminho, chunks=chunks)
+
+# Carrega os datasets de temperatura e precipitação do ERA5 (NetCDF ou GRIB)
+def load_era5_data(data_dir='data', temp_file=None, precip_file=None):
+    temp_file = os.path.join(data_dir, temp_file) if temp_file else _localizar_arquivo(data_dir, 'data_0')
+    precip_file = os.path.join(data_dir, precip_file) if precip_file else _localizar_arquivo(data_dir, 'data_1')
 
     if os.path.exists(temp_file):
-        dados_temp = xr.open_dataset(temp_file)
+        dados_temp = open_era5_file(temp_file)
         print(f"Dataset ERA5 carregado com sucesso: {os.path.basename(temp_file)}")
     else:
         print(f"Erro: Arquivo não encontrado: {temp_file}")
         dados_temp = None
 
     if os.path.exists(precip_file):
-        dados_precip = xr.open_dataset(precip_file)
+        dados_precip = open_era5_file(precip_file)
         print(f"Dataset ERA5 carregado com sucesso: {os.path.basename(precip_file)}")
     else:
         print(f"Erro: Arquivo não encontrado: {precip_file}")
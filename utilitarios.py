@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo com funções compartilhadas pelos caches do projeto.
+
+Reúne o hash das entradas (usado pelas figuras, checkpoints e limiares) e os
+manifestos JSON gravados de forma atômica (arquivo temporário + os.replace),
+para que uma execução interrompida nunca deixe um arquivo pela metade.
+
+@author: Gustavo Starling
+
+"""
+
+import os
+import json
+import hashlib
+from contextlib import contextmanager
+import numpy as np
+
+# Atualiza o hash com o conteúdo de uma entrada (arrays, séries, datasets ou valores simples)
+def _atualizar_hash(h, entrada):
+    if hasattr(entrada, 'data_vars'):  # xr.Dataset
+        for nome in sorted(entrada.data_vars):
+            h.update(str(nome).encode())
+            _atualizar_hash(h, entrada[nome])
+        return
+    if hasattr(entrada, 'values') and not isinstance(entrada, dict):  # xr.DataArray, pd.Series, pd.DataFrame
+        if hasattr(entrada, 'coords') and hasattr(entrada, 'dims'):
+            for dim in entrada.dims:
+                if dim in entrada.coords:
+                    _atualizar_hash(h, np.asarray(entrada.coords[dim].values))
+        elif hasattr(entrada, 'index'):
+            _atualizar_hash(h, np.asarray(entrada.index))
+        entrada = entrada.values
+    if isinstance(entrada, (list, tuple)) and any(hasattr(item, '__len__') and not isinstance(item, str) for item in entrada):
+        for item in entrada:
+            _atualizar_hash(h, item)
+        return
+    if isinstance(entrada, (np.ndarray, list, tuple)):
+        array = np.ascontiguousarray(np.asarray(entrada))
+        h.update(f'{array.dtype.str}{array.shape}'.encode())
+        if array.dtype.hasobject:
+            h.update(repr(array.tolist()).encode())
+        else:
+            h.update(array.tobytes())
+        return
+    if isinstance(entrada, dict):
+        for chave in sorted(entrada, key=str):
+            h.update(str(chave).encode())
+            _atualizar_hash(h, entrada[chave])
+        return
+    h.update(repr(entrada).encode())
+
+# Calcula o hash das entradas e dos parâmetros de uma figura, etapa ou cache
+def calcular_hash(*entradas, **parametros):
+    h = hashlib.sha256()
+    for entrada in entradas:
+        _atualizar_hash(h, entrada)
+    _atualizar_hash(h, parametros)
+    return h.hexdigest()
+
+# Grava um arquivo de forma atômica: escreve em '<caminho>.tmp' e substitui o destino ao final
+@contextmanager
+def escrita_atomica(caminho, modo='w'):
+    temporario = caminho + '.tmp'
+    opcoes = {} if 'b' in modo else {'encoding': 'utf-8'}
+    try:
+        with open(temporario, modo, **opcoes) as f:
+            yield f
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    os.replace(temporario, caminho)
+
+# Lê um manifesto JSON (vazio se ainda não existe ou está corrompido)
+def carregar_manifesto(caminho):
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+# Registra uma entrada no manifesto JSON, com escrita atômica
+def atualizar_manifesto(caminho, chave, valor):
+    manifesto = carregar_manifesto(caminho)
+    manifesto[chave] = valor
+    with escrita_atomica(caminho) as f:
+        json.dump(manifesto, f, indent=2, sort_keys=True)
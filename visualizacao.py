@@ -7,10 +7,14 @@ import matplotlib.pyplot as plt
 import cartopy.crs as ccrs
 import os
 import numpy as np
+from piramide import escolher_nivel
+from utilitarios import calcular_hash
+from cache_figuras import precisa_regenerar, registrar_figura
 
 # Gera mapas da temperatura máxima anual
 
-def plot_annual_max_temperature_maps(dados_era5, regiao_sul_geometry, anos_interesse, output_dir='figures'):
+def plot_annual_max_temperature_maps(dados_era5, regiao_sul_geometry, anos_interesse, output_dir='figures',
+                                     piramide=None, fatores_piramide=None, dpi=100, forcar=False, sem_figuras=False):
     """
     Plota mapas da temperatura máxima anual para anos específicos.
 
@@ -19,47 +23,93 @@ def plot_annual_max_temperature_maps(dados_era5, regiao_sul_geometry, anos_inter
         regiao_sul_geometry (Polygon): Geometria da Região Sul do Brasil.
         anos_interesse (list): Lista de anos para os quais os mapas serão gerados.
         output_dir (str, opcional): Diretório para salvar os mapas. Padrão é 'figures'.
+        piramide (dict ou callable, opcional): Níveis de resolução (ver piramide.carregar_piramide)
+            ou uma função sem argumentos que os retorna. Quando informado, o mapa usa o nível mais
+            grosseiro compatível com o DPI de saída; a função só é chamada se algum mapa precisar
+            ser refeito, e os níveis abertos por ela são fechados ao final.
+        fatores_piramide (tuple, opcional): Fatores de redução da pirâmide, que entram no hash
+            dos mapas. Padrão são os fatores do dict 'piramide'; informe-os quando 'piramide'
+            for uma função.
+        dpi (int, opcional): Resolução das figuras salvas. Padrão é 100.
+        forcar (bool, opcional): Regenera os mapas mesmo que os dados não tenham mudado.
+        sem_figuras (bool, opcional): Não gera nenhum mapa (--sem-figuras).
     """
+    if sem_figuras:
+        return
+
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
+    largura_figura = 10
+    extensao_graus = (regiao_sul_geometry.bounds[2] - regiao_sul_geometry.bounds[0]) + 2
+    nivel = None
+    niveis_abertos = {}
+    # Os fatores da pirâmide entram no hash: mudar os níveis também refaz os mapas
+    if piramide is not None and fatores_piramide is None and not callable(piramide):
+        fatores_piramide = tuple(piramide)
+    if piramide is not None and fatores_piramide is not None:
+        fatores_piramide = tuple(sorted(set(fatores_piramide) | {1}))
+
     for year in anos_interesse:
         # Seleciona os dados para o ano específico usando a coordenada 'valid_time'
         dados_anuais = dados_era5.sel(valid_time=dados_era5['valid_time'].dt.year == year)
 
         # Verifica se há algum dado para o ano selecionado
-        if dados_anuais.sizes['valid_time'] > 0:
-            temperatura_maxima_anual = dados_anuais['t2m'].max(dim='valid_time')
-
-            try:
-                # Verifique se os dados de temperatura máxima têm CRS e defina caso não tenha
-                if temperatura_maxima_anual.rio.crs is None:
-                    # Defina o CRS (exemplo, EPSG:4326, ajuste conforme necessário)
-                    temperatura_maxima_anual = temperatura_maxima_anual.rio.write_crs('EPSG:4326', inplace=True)
-
-                # Realize o recorte após definir o CRS
-                temperatura_recortada = temperatura_maxima_anual.rio.clip([regiao_sul_geometry], crs=temperatura_maxima_anual.rio.crs)
-            except AttributeError:
-                print(f"Aviso: Informação de CRS ausente. Pulando recorte via rio.clip para o ano {year}.")
-                temperatura_recortada = temperatura_maxima_anual.sel(
-                    longitude=slice(regiao_sul_geometry.bounds[0], regiao_sul_geometry.bounds[2]),
-                    latitude=slice(regiao_sul_geometry.bounds[1], regiao_sul_geometry.bounds[3])
-                )
-
-            plt.figure(figsize=(10, 8))
-            ax = plt.axes(projection=ccrs.PlateCarree())
-            temperatura_recortada.plot(ax=ax, cmap='coolwarm', cbar_kwargs={'label': 'Temperatura Máxima Anual (°C)'})
-            ax.add_geometries([regiao_sul_geometry], crs=ccrs.PlateCarree(), facecolor='none', edgecolor='black', linewidth=1)
-            ax.set_extent([regiao_sul_geometry.bounds[0] - 1, regiao_sul_geometry.bounds[2] + 1,
-                            regiao_sul_geometry.bounds[1] - 1, regiao_sul_geometry.bounds[3] + 1], crs=ccrs.PlateCarree())
-            ax.set_title(f'Temperatura Máxima Anual em {year}')
-            ax.coastlines(resolution='50m')
-            ax.gridlines(draw_labels=True, linewidth=0.5, color='gray', alpha=0.5, linestyle='--')
-            plt.tight_layout()
-            plt.savefig(os.path.join(output_dir, f'temperatura_maxima_{year}.png'))
-            plt.close()
-        else:
+        if dados_anuais.sizes['valid_time'] == 0:
             print(f"Aviso: Não há dados disponíveis para o ano {year}, o mapa da temperatura máxima anual não será gerado.")
+            continue
+        temperatura_maxima_anual = dados_anuais['t2m'].max(dim='valid_time')
+
+        # Pula o mapa se os dados e parâmetros forem os mesmos da última execução
+        nome_arquivo_mapa = os.path.join(output_dir, f'temperatura_maxima_{year}.png')
+        hash_mapa = calcular_hash(temperatura_maxima_anual, regiao_sul_geometry.wkb, year=year, dpi=dpi,
+                                  fatores_piramide=fatores_piramide)
+        if not precisa_regenerar(nome_arquivo_mapa, hash_mapa, forcar):
+            print(f"Figura inalterada, mantida: {nome_arquivo_mapa}")
+            continue
+
+        if piramide is not None:
+            # A pirâmide só é obtida (e construída, se for uma função) quando algum mapa muda
+            if nivel is None:
+                niveis = piramide() if callable(piramide) else piramide
+                if callable(piramide):
+                    niveis_abertos = niveis
+                nivel = escolher_nivel(niveis, extensao_graus, largura_figura * dpi) if niveis else False
+            if nivel is not False and year in nivel['year'].values:
+                # Usa a máxima anual já calculada no nível escolhido da pirâmide
+                temperatura_maxima_anual = nivel['t2m_max'].sel(year=year)
+
+        try:
+            # Verifique se os dados de temperatura máxima têm CRS e defina caso não tenha
+            if temperatura_maxima_anual.rio.crs is None:
+                # Defina o CRS (exemplo, EPSG:4326, ajuste conforme necessário)
+                temperatura_maxima_anual = temperatura_maxima_anual.rio.write_crs('EPSG:4326', inplace=True)
+
+            # Realize o recorte após definir o CRS
+            temperatura_recortada = temperatura_maxima_anual.rio.clip([regiao_sul_geometry], crs=temperatura_maxima_anual.rio.crs)
+        except AttributeError:
+            print(f"Aviso: Informação de CRS ausente. Pulando recorte via rio.clip para o ano {year}.")
+            temperatura_recortada = temperatura_maxima_anual.sel(
+                longitude=slice(regiao_sul_geometry.bounds[0], regiao_sul_geometry.bounds[2]),
+                latitude=slice(regiao_sul_geometry.bounds[1], regiao_sul_geometry.bounds[3])
+            )
+
+        plt.figure(figsize=(largura_figura, 8))
+        ax = plt.axes(projection=ccrs.PlateCarree())
+        temperatura_recortada.plot(ax=ax, cmap='coolwarm', cbar_kwargs={'label': 'Temperatura Máxima Anual (°C)'})
+        ax.add_geometries([regiao_sul_geometry], crs=ccrs.PlateCarree(), facecolor='none', edgecolor='black', linewidth=1)
+        ax.set_extent([regiao_sul_geometry.bounds[0] - 1, regiao_sul_geometry.bounds[2] + 1,
+                        regiao_sul_geometry.bounds[1] - 1, regiao_sul_geometry.bounds[3] + 1], crs=ccrs.PlateCarree())
+        ax.set_title(f'Temperatura Máxima Anual em {year}')
+        ax.coastlines(resolution='50m')
+        ax.gridlines(draw_labels=True, linewidth=0.5, color='gray', alpha=0.5, linestyle='--')
+        plt.tight_layout()
+        plt.savefig(nome_arquivo_mapa, dpi=dpi)
+        plt.close()
+        registrar_figura(nome_arquivo_mapa, hash_mapa)
+
+    for nivel_aberto in niveis_abertos.values():
+        nivel_aberto.close()
 
     print(f"\nMapas de temperatura máxima anual salvos em: {output_dir}")
 
@@ -125,4 +175,93 @@ def plot_annual_scatter(x_dados, y_dados, titulo, xlabel, ylabel, filename, colo
     plt.grid(True)
     plt.tight_layout()
     plt.savefig(filename)
-    plt.close()
\ No newline at end of file
+    plt.close()
+
+# Gera gráfico da decomposição sazonal (original, tendência, sazonalidade e resíduo)
+def plot_seasonal_decomposition(observado, tendencia, sazonalidade, residuo, filename):
+    plt.figure(figsize=(12, 8))
+    for posicao, (componente, rotulo) in enumerate([(observado, 'Original'), (tendencia, 'Tendência'),
+                                                    (sazonalidade, 'Sazonalidade'), (residuo, 'Resíduo')], start=1):
+        plt.subplot(4, 1, posicao)
+        plt.plot(componente, label=rotulo)
+        plt.legend(loc='upper left')
+    plt.tight_layout()
+    plt.savefig(filename)
+    plt.close()
+
+# Gera gráfico da decomposição de uma série anual (original, tendência e resíduo)
+def plot_annual_decomposition(serie, tendencia, residuo, nome, titulo, filename, figsize=(12, 8)):
+    plt.figure(figsize=figsize)
+    for posicao, (componente, rotulo) in enumerate([(serie, f'Série Original da {nome}'),
+                                                    (tendencia, f'Tendência da {nome}'),
+                                                    (residuo, f'Resíduo da {nome}')], start=1):
+        plt.subplot(3, 1, posicao)
+        plt.plot(componente, label=rotulo)
+        plt.legend(loc='upper left')
+        plt.title(titulo if posicao == 1 else rotulo)
+    plt.tight_layout()
+    plt.savefig(filename)
+    plt.close()
+
+# Gera boxplot mensal (uma caixa por mês) de uma coluna das estatísticas mensais
+def plot_monthly_boxplot(dados_mensais, coluna, titulo, ylabel, filename, figsize=(12, 6)):
+    fig, ax = plt.subplots(figsize=figsize)
+    dados_mensais.boxplot(column=coluna, by='Mês', ax=ax)
+    ax.set_title(titulo)
+    fig.suptitle('') # Remover o título padrão do pandas
+    ax.set_xlabel('Mês')
+    ax.set_ylabel(ylabel)
+    plt.savefig(filename)
+    plt.close()
+
+# Gera gráfico da série anual com a reta de tendência
+def plot_annual_trend(anos, valores, linha_tendencia, slope, variavel, filename, figsize=(10, 6)):
+    plt.figure(figsize=figsize)
+    plt.plot(anos, valores, label=variavel)
+    plt.plot(anos, linha_tendencia, color='red', linestyle='--', label=f'Tendência (slope={slope:.4f})')
+    plt.title(f'Tendência Anual de {variavel}')
+    plt.xlabel('Ano')
+    plt.ylabel(variavel)
+    plt.legend()
+    plt.grid(True)
+    plt.savefig(filename)
+    plt.close()
+
+# Gera gráfico da série temporal anual
+def plot_annual_time_series(anos, valores, titulo, ylabel, filename, figsize=(12, 6)):
+    plt.figure(figsize=figsize)
+    plt.plot(anos, valores, marker='o', linestyle='-')
+    plt.title(titulo)
+    plt.xlabel('Ano')
+    plt.ylabel(ylabel)
+    plt.grid(True)
+    plt.savefig(filename)
+    plt.close()
+
+# Gera gráfico de barras com a média de cada mês (padrão sazonal)
+def plot_monthly_seasonality(medias_mensais, titulo, ylabel, filename, figsize=(10, 6)):
+    plt.figure(figsize=figsize)
+    medias_mensais.plot(kind='bar')
+    plt.title(titulo)
+    plt.xlabel('Mês')
+    plt.ylabel(ylabel)
+    plt.xticks(rotation=0)
+    plt.grid(axis='y')
+    plt.savefig(filename)
+    plt.close()
+
+# Gera mapa da diferença entre dois datasets (ex.: ERA5-Land - ERA5)
+def plot_difference_map(diferenca, regiao_sul_geometry, titulo, rotulo, filename):
+    plt.figure(figsize=(10, 8))
+    ax = plt.axes(projection=ccrs.PlateCarree())
+    limite = float(np.nanmax(np.abs(diferenca.values))) or 1.0
+    diferenca.plot(ax=ax, cmap='RdBu_r', vmin=-limite, vmax=limite, cbar_kwargs={'label': rotulo})
+    ax.add_geometries([regiao_sul_geometry], crs=ccrs.PlateCarree(), facecolor='none', edgecolor='black', linewidth=1)
+    ax.set_extent([regiao_sul_geometry.bounds[0] - 1, regiao_sul_geometry.bounds[2] + 1,
+                    regiao_sul_geometry.bounds[1] - 1, regiao_sul_geometry.bounds[3] + 1], crs=ccrs.PlateCarree())
+    ax.set_title(titulo)
+    ax.coastlines(resolution='50m')
+    ax.gridlines(draw_labels=True, linewidth=0.5, color='gray', alpha=0.5, linestyle='--')
+    plt.tight_layout()
+    plt.savefig(filename)
+    plt.close()